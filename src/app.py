@@ -0,0 +1,57 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from flask_cors import CORS
+from src.models.user import db
+from src.database.engine import init_database, database_stats
+from src.routes.user import user_bp
+from src.routes.export import export_bp, export_cache, export_jobs
+from src.routes.conversation import conversation_bp
+from src.utils.conversation_intelligence import TURN_ROUTE_STATS
+
+def create_app(config=None):
+    """Build the database-backed API: conversations, exports and users under /api.
+
+    ``config`` overrides app settings before the database is set up, e.g. a
+    ``SQLALCHEMY_DATABASE_URI`` pointing somewhere other than DATABASE_URL.
+    """
+    app = Flask(__name__)
+    if config:
+        app.config.update(config)
+
+    CORS(app, origins=[
+        "https://coursedesignerassistant.netlify.app",
+        "http://localhost:3000",
+        "http://localhost:5173"
+    ])
+
+    # Applies pending SQLite migrations and installs the engine's pragmas and lock-wait hooks
+    init_database(app)
+    with app.app_context():
+        db.create_all()
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    # Registered ahead of conversation_bp so its cached exporters answer the
+    # /export and /summary routes both blueprints define
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(conversation_bp, url_prefix='/api')
+
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        return jsonify({
+            "message": "She Is AI Assistant API is running",
+            "status": "healthy",
+            "database": database_stats(),
+            "turn_routes": TURN_ROUTE_STATS.stats(),
+            "export_cache": export_cache.stats(),
+            "export_jobs": export_jobs.stats()
+        })
+
+    return app
+
+if __name__ == '__main__':
+    app = create_app()
+    port = int(os.environ.get('PORT', 5000))
+    app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.database.migrations import migrate
+
+# Benchmark for the history lookup every request makes, run against a schema
+# without the indexes (as existing databases have it) and again after the
+# migration. Run with: python -m src.database.benchmark_indexes [messages]
+
+# The schema as it stood before migration 1, written out rather than taken from
+# the models so the benchmark still starts from it as later migrations land
+BASELINE_SCHEMA = [
+    'CREATE TABLE conversation ('
+    'id INTEGER NOT NULL PRIMARY KEY, session_id VARCHAR(100) NOT NULL UNIQUE, '
+    'created_at DATETIME, updated_at DATETIME, status VARCHAR(20), '
+    'course_title VARCHAR(200), target_audience VARCHAR(100), educational_level VARCHAR(50), '
+    'duration VARCHAR(50), learning_objectives TEXT, assessment_approach VARCHAR(100), '
+    'delivery_method VARCHAR(100), bias_considerations TEXT, '
+    'current_step INTEGER, total_steps INTEGER, completion_percentage FLOAT, framework_areas_covered TEXT)',
+    'CREATE TABLE message ('
+    'id INTEGER NOT NULL PRIMARY KEY, conversation_id INTEGER NOT NULL REFERENCES conversation (id), '
+    'sender VARCHAR(20) NOT NULL, content TEXT NOT NULL, timestamp DATETIME, message_type VARCHAR(50), '
+    'intent VARCHAR(100), confidence FLOAT, framework_references TEXT)',
+    'CREATE TABLE framework_concept ('
+    'id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(100) NOT NULL, category VARCHAR(50) NOT NULL, '
+    'description TEXT, examples TEXT, level_adaptations TEXT)'
+]
+
+HOT_QUERY = (
+    'SELECT id, sender, content, timestamp FROM message '
+    'WHERE conversation_id = ? ORDER BY timestamp'
+)
+
+def build_database(path, total_messages, messages_per_conversation=50):
+    """Create the unindexed schema and fill it with interleaved conversations"""
+    db = sqlite3.connect(path)
+    for statement in BASELINE_SCHEMA:
+        db.execute(statement)
+
+    conversation_count = max(1, total_messages // messages_per_conversation)
+    start = datetime(2024, 1, 1)
+    db.executemany(
+        'INSERT INTO conversation (id, session_id, created_at, updated_at, status) VALUES (?, ?, ?, ?, ?)',
+        ((i, f'session-{i}', start, start, 'active') for i in range(1, conversation_count + 1))
+    )
+
+    # Conversations run concurrently, so their messages are scattered across the table
+    def rows():
+        for n in range(total_messages):
+            yield (
+                random.randint(1, conversation_count),
+                random.choice(('user', 'assistant')),
+                'benchmark message body ' * 4,
+                start + timedelta(seconds=n)
+            )
+
+    db.executemany(
+        'INSERT INTO message (conversation_id, sender, content, timestamp) VALUES (?, ?, ?, ?)', rows()
+    )
+    db.commit()
+    db.close()
+    return conversation_count
+
+def time_lookups(path, conversation_count, lookups):
+    """Return (median ms, query plan) for the hot history query"""
+    db = sqlite3.connect(path)
+    plan = ' / '.join(row[-1] for row in db.execute('EXPLAIN QUERY PLAN ' + HOT_QUERY, (1,)))
+    timings = []
+    for _ in range(lookups):
+        conversation_id = random.randint(1, conversation_count)
+        began = time.perf_counter()
+        db.execute(HOT_QUERY, (conversation_id,)).fetchall()
+        timings.append((time.perf_counter() - began) * 1000)
+    db.close()
+    timings.sort()
+    return timings[len(timings) // 2], plan
+
+def run(total_messages=1_000_000):
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.db')
+
+        began = time.perf_counter()
+        conversation_count = build_database(path, total_messages)
+        print(f'Built {total_messages:,} messages in {conversation_count:,} conversations '
+              f'({time.perf_counter() - began:.1f}s)')
+
+        median, plan = time_lookups(path, conversation_count, lookups=20)
+        print(f'Before migration: median {median:.2f} ms per lookup  [{plan}]')
+
+        began = time.perf_counter()
+        migrate(path)
+        print(f'Migration took {time.perf_counter() - began:.1f}s')
+
+        median, plan = time_lookups(path, conversation_count, lookups=2000)
+        print(f'After migration:  median {median:.3f} ms per lookup  [{plan}]')
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
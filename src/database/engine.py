@@ -0,0 +1,164 @@
+import os
+import time
+import logging
+import sqlite3
+import threading
+from sqlalchemy import event, exc
+from src.models.user import db
+from src.database.migrations import migrate
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.db')
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+logger = logging.getLogger(__name__)
+
+def database_uri():
+    """DATABASE_URL if set (e.g. a PostgreSQL server), otherwise the bundled SQLite file"""
+    uri = os.getenv('DATABASE_URL')
+    if not uri:
+        return f'sqlite:///{DEFAULT_SQLITE_PATH}'
+    # Some hosts still hand out the scheme SQLAlchemy dropped in 1.4
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+def sqlite_pragmas():
+    """Connection pragmas for a file-backed SQLite database"""
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024)),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE_BYTES', 256 * 1024 * 1024)),
+        'temp_store': 'MEMORY'
+    }
+
+def engine_options(uri):
+    """Pool settings for the engine behind db"""
+    if uri.startswith('sqlite') and (':memory:' in uri or uri in ('sqlite://', 'sqlite:///')):
+        # In-memory databases live in a single connection; there's nothing to pool
+        return {}
+    
+    options = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT_SECONDS', 30))
+    }
+    if uri.startswith('sqlite'):
+        options['connect_args'] = {'check_same_thread': False}
+    else:
+        options['pool_pre_ping'] = True
+        options['pool_recycle'] = int(os.getenv('DB_POOL_RECYCLE_SECONDS', 1800))
+    return options
+
+def begin_immediate_enabled():
+    """Whether SQLite write transactions take the write lock up front (SQLITE_BEGIN_IMMEDIATE=1)"""
+    return os.getenv('SQLITE_BEGIN_IMMEDIATE', '0').lower() in ('1', 'true', 'yes')
+
+class LockWaitStats:
+    """Time spent waiting for SQLite's write lock.
+
+    With ``SQLITE_BEGIN_IMMEDIATE`` enabled, writes on a SQLite connection begin
+    their transaction with an explicit ``BEGIN IMMEDIATE`` (see ``_begin_write``),
+    which returns as soon as the write lock is held; its duration is the wait
+    and nothing else. Waits of ``slow_threshold`` seconds or more are counted as
+    contended and logged. ``database is locked`` errors are counted separately,
+    whether or not waits are timed.
+    """
+
+    def __init__(self, slow_threshold=0.1):
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self.counters = {'lock_acquisitions': 0, 'contended': 0, 'lock_errors': 0}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, elapsed):
+        with self._lock:
+            self.counters['lock_acquisitions'] += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+            contended = elapsed >= self.slow_threshold
+            if contended:
+                self.counters['contended'] += 1
+        if contended:
+            logger.info('Waited %.3fs for the SQLite write lock', elapsed)
+
+    def record_lock_error(self):
+        with self._lock:
+            self.counters['lock_errors'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['wait_seconds_total'] = round(self.total_wait, 6)
+            stats['wait_seconds_max'] = round(self.max_wait, 6)
+        acquisitions = stats['lock_acquisitions']
+        stats['wait_seconds_avg'] = round(stats['wait_seconds_total'] / acquisitions, 6) if acquisitions else 0.0
+        return stats
+
+lock_wait_stats = LockWaitStats(float(os.getenv('DB_SLOW_WRITE_SECONDS', 0.1)))
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+def _begin_write(conn, cursor, statement, parameters, context, executemany):
+    """Take the write lock up front for a transaction's first write, timing only the wait.
+
+    sqlite3 would otherwise open a deferred transaction right before the write
+    and acquire the lock inside it, mixing the wait with the statement's own
+    work. Once a transaction is open, sqlite3 leaves it alone, so commit and
+    rollback behave as before.
+
+    This changes how every write transaction on the engine begins: a writer
+    holds the lock from its first write, so it can't be upgraded mid-transaction
+    into a ``database is locked`` error, but it also blocks other writers for
+    longer. It is only installed when SQLITE_BEGIN_IMMEDIATE is enabled.
+    """
+    if cursor.connection.in_transaction or not statement.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+        return
+    started = time.perf_counter()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+    except sqlite3.OperationalError as e:
+        # Raised outside SQLAlchemy's error handling, so count and wrap it here
+        if 'database is locked' in str(e):
+            lock_wait_stats.record_lock_error()
+        raise exc.OperationalError('BEGIN IMMEDIATE', None, e) from e
+    lock_wait_stats.record_wait(time.perf_counter() - started)
+
+def _handle_error(exception_context):
+    if 'database is locked' in str(exception_context.original_exception):
+        lock_wait_stats.record_lock_error()
+
+def database_stats():
+    """Write-lock wait counters plus the connection pool's current state"""
+    stats = lock_wait_stats.stats()
+    stats['begin_immediate'] = begin_immediate_enabled()
+    stats['pool'] = db.engine.pool.status()
+    return stats
+
+def init_database(app):
+    """Point db at the configured database, bring its schema up to date and tune its engine"""
+    uri = app.config.setdefault('SQLALCHEMY_DATABASE_URI', database_uri())
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri))
+    db.init_app(app)
+
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == 'sqlite':
+            if engine.url.database not in (None, '', ':memory:'):
+                # Columns such as message_count only exist once the migrations have run
+                if os.path.exists(engine.url.database):
+                    applied = migrate(engine.url.database)
+                    if applied:
+                        logger.info('Applied database migrations %s', applied)
+                event.listen(engine, 'connect', _apply_sqlite_pragmas)
+            if begin_immediate_enabled():
+                event.listen(engine, 'before_cursor_execute', _begin_write)
+            event.listen(engine, 'handle_error', _handle_error)
+    return db
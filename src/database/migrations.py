@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import sqlite3
+
+# Versioned schema migrations for the SQLite application database, tracked in
+# PRAGMA user_version. init_database applies them when the app starts; to run
+# them by hand (e.g. as a deploy step): python -m src.database.migrations [path/to/app.db]
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.db')
+
+def add_column(table, column, definition):
+    """ALTER TABLE ... ADD COLUMN that skips columns the table already has.
+
+    Databases created by db.create_all() get the current columns up front but
+    start at user_version 0, so their migrations must tolerate them.
+    """
+    def statement(db):
+        if column not in {row[1] for row in db.execute(f'PRAGMA table_info({table})')}:
+            db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    return statement
+
+def backfill_insight_flags(db):
+    """Flag insights on existing conversations from their user messages"""
+    from src.models.conversation import INSIGHT_KEYWORDS
+
+    flags = {}
+    for conversation_id, content in db.execute("SELECT conversation_id, content FROM message WHERE sender = 'user'"):
+        found = flags.setdefault(conversation_id, set())
+        content = content.lower()
+        for insight, keywords in INSIGHT_KEYWORDS.items():
+            if any(keyword in content for keyword in keywords):
+                found.add(insight)
+    db.executemany('UPDATE conversation SET insight_flags = ? WHERE id = ?', [
+        (json.dumps([insight for insight in INSIGHT_KEYWORDS if insight in found]), conversation_id)
+        for conversation_id, found in flags.items() if found
+    ])
+
+# (version, description, statements), in the order they must be applied; a
+# statement may also be a callable that takes the connection
+MIGRATIONS = [
+    (1, 'Index hot message and conversation lookups', [
+        'CREATE INDEX IF NOT EXISTS ix_message_conversation_timestamp ON message (conversation_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS ix_conversation_updated_at ON conversation (updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_conversation_status_updated_at ON conversation (status, updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_conversation_created_at ON conversation (created_at)',
+        'ANALYZE'
+    ]),
+    (2, 'Denormalized message count on conversation', [
+        add_column('conversation', 'message_count', 'INTEGER NOT NULL DEFAULT 0'),
+        'UPDATE conversation SET message_count = '
+        '(SELECT COUNT(*) FROM message WHERE message.conversation_id = conversation.id)'
+    ]),
+    (3, 'Per-sender counts, confidence aggregates and insight flags on conversation', [
+        add_column('conversation', 'user_message_count', 'INTEGER NOT NULL DEFAULT 0'),
+        add_column('conversation', 'assistant_message_count', 'INTEGER NOT NULL DEFAULT 0'),
+        add_column('conversation', 'confidence_sum', 'FLOAT NOT NULL DEFAULT 0'),
+        add_column('conversation', 'confidence_count', 'INTEGER NOT NULL DEFAULT 0'),
+        add_column('conversation', 'insight_flags', 'TEXT'),
+        'UPDATE conversation SET '
+        "user_message_count = (SELECT COUNT(*) FROM message WHERE message.conversation_id = conversation.id AND sender = 'user'), "
+        "assistant_message_count = (SELECT COUNT(*) FROM message WHERE message.conversation_id = conversation.id AND sender = 'assistant'), "
+        'confidence_sum = (SELECT COALESCE(SUM(confidence), 0) FROM message WHERE message.conversation_id = conversation.id), '
+        'confidence_count = (SELECT COUNT(confidence) FROM message WHERE message.conversation_id = conversation.id)',
+        backfill_insight_flags
+    ]),
+    (4, 'Unique framework concept names and seed checksums', [
+        'DELETE FROM framework_concept WHERE id NOT IN (SELECT MIN(id) FROM framework_concept GROUP BY name)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_framework_concept_name ON framework_concept (name)',
+        'CREATE TABLE IF NOT EXISTS seed_state ('
+        'name VARCHAR(50) NOT NULL PRIMARY KEY, checksum VARCHAR(64) NOT NULL, seeded_at DATETIME)'
+    ]),
+]
+
+def current_version(db):
+    return db.execute('PRAGMA user_version').fetchone()[0]
+
+def has_schema(db):
+    return db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'conversation'").fetchone() is not None
+
+def migrate(db_path=DEFAULT_DB_PATH, target=None):
+    """Apply pending migrations up to target (default: latest); return the applied versions.
+
+    Each migration runs in its own transaction and bumps user_version only once
+    all of its statements have succeeded, so a failed run can simply be retried.
+    A database without the application tables is left alone: db.create_all()
+    gives it the current schema, which later runs accept as is.
+    """
+    db = sqlite3.connect(db_path, isolation_level=None)
+    applied = []
+    try:
+        if not has_schema(db):
+            return applied
+        for version, description, statements in MIGRATIONS:
+            if target is not None and version > target:
+                break
+            if version <= current_version(db):
+                continue
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                for statement in statements:
+                    if callable(statement):
+                        statement(db)
+                    else:
+                        db.execute(statement)
+                # PRAGMA doesn't take bound parameters; version is an int from MIGRATIONS
+                db.execute(f'PRAGMA user_version = {int(version)}')
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            applied.append(version)
+    finally:
+        db.close()
+    return applied
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH
+    versions = migrate(path)
+    if versions:
+        print(f'Applied migrations {versions} to {path}')
+    else:
+        print(f'{path} is up to date')
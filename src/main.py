@@ -1,16 +1,21 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
-import os
 import uuid
 import json
 from datetime import datetime
 import openai
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor
 import io
+from src.utils.keyword_matcher import KEYWORD_MATCHER, AI_TOOLS, GOAL_KEYWORDS, ASSESSMENT_KEYWORDS
+from src.utils.report_templates import DESIGN_REPORT_STYLES, DESIGN_REPORT_SECTIONS, static_flowables
+from src.utils.session_store import create_session_store
+from src.utils.export_jobs import get_export_job_queue, ExportQueueFullError
 
 app = Flask(__name__)
 
@@ -25,8 +30,12 @@ CORS(app, origins=[
 openai.api_key = os.getenv('OPENAI_API_KEY')
 openai.api_base = os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')
 
-# In-memory storage for conversations
-conversations = {}
+# Conversation storage (in-memory by default, SQLite/WAL with SESSION_STORE=sqlite)
+conversations = create_session_store()
+
+# PDF reports can render on a process pool via /api/conversations/<id>/exports;
+# set EXPORT_JOBS_DIR so any worker can answer a job's status poll
+export_jobs = get_export_job_queue()
 
 # She Is AI Framework Areas - Complete Set
 FRAMEWORK_AREAS = [
@@ -42,9 +51,12 @@ FRAMEWORK_AREAS = [
     "Course Implementation"
 ]
 
-def extract_course_information(messages):
-    """Extract comprehensive course information from conversation"""
-    info = {
+# Substantial answers remembered per conversation
+MAX_UNIQUE_ASPECTS = 10
+
+def new_course_information():
+    """Create an empty course information record"""
+    return {
         "learner_type": None,
         "learner_background": None,
         "ai_tools": [],
@@ -60,45 +72,76 @@ def extract_course_information(messages):
         "implementation_plan": [],
         "teaching_methods": [],
         "unique_aspects": [],
-        "areas_covered": set()
+        "areas_covered": set(),
+        "user_responses": 0
     }
+
+def update_course_information(info, message, hits=None):
+    """Fold a single user message (and its KEYWORD_MATCHER scan, if known) into the running course information"""
+    content = message.lower()
+    if hits is None:
+        hits = KEYWORD_MATCHER.scan(content)
+    info["user_responses"] = info.get("user_responses", 0) + 1
+    
+    # Extract learner information
+    learner_type = KEYWORD_MATCHER.first_category(hits, 'learner')
+    if learner_type:
+        info["learner_type"] = learner_type
+    
+    # Extract AI tools
+    for tool in AI_TOOLS:
+        if ('tools', tool) in hits and tool not in info["ai_tools"]:
+            info["ai_tools"].append(tool)
+    
+    # Extract goals and methods
+    for goal in GOAL_KEYWORDS:
+        if ('goals', goal) in hits and goal not in info["learning_goals"]:
+            info["learning_goals"].append(goal)
+    for method in ASSESSMENT_KEYWORDS:
+        if ('assessment', method) in hits and method not in info["assessment_methods"]:
+            info["assessment_methods"].append(method)
+    
+    # Track unique aspects, keeping only the most recent few so the state stays bounded
+    if len(content) > 50:  # Substantial responses
+        aspect = content[:100] + "..." if len(content) > 100 else content
+        if aspect not in info["unique_aspects"]:
+            info["unique_aspects"].append(aspect)
+            del info["unique_aspects"][:-MAX_UNIQUE_ASPECTS]
+    
+    return info
+
+def extract_course_information(messages):
+    """Extract comprehensive course information from conversation"""
+    info = new_course_information()
     
     for msg in messages:
         if msg.get('sender') == 'user':
-            content = msg.get('content', '').lower()
-            
-            # Extract learner information
-            if 'professional' in content:
-                info["learner_type"] = "professionals"
-            elif 'student' in content:
-                info["learner_type"] = "students"
-            elif 'career chang' in content:
-                info["learner_type"] = "career changers"
-            
-            # Extract AI tools
-            tools = ['n8n', 'gamma', 'canva', 'chatgpt', 'gemini', 'manus', 'claude']
-            for tool in tools:
-                if tool in content and tool not in info["ai_tools"]:
-                    info["ai_tools"].append(tool)
-            
-            # Extract goals and methods
-            if 'foundation' in content or 'basic' in content:
-                info["learning_goals"].append("foundational understanding")
-            if 'hands-on' in content or 'practical' in content:
-                info["learning_goals"].append("practical application")
-            if 'quiz' in content or 'assessment' in content:
-                info["assessment_methods"].append("interactive assessment")
-            
-            # Track unique aspects
-            if len(content) > 50:  # Substantial responses
-                info["unique_aspects"].append(content[:100] + "..." if len(content) > 100 else content)
+            update_course_information(info, msg.get('content', ''))
     
     return info
 
+def get_course_information(conversation):
+    """Return the conversation's running course information, rebuilding it only if missing"""
+    if 'course_info' not in conversation:
+        conversation['course_info'] = extract_course_information(conversation.get('messages', []))
+    return conversation['course_info']
+
+def add_user_message(conversation, content, hits=None):
+    """Append a user message and update the extraction state from it once"""
+    user_msg = {
+        "id": str(uuid.uuid4()),
+        "sender": "user",
+        "content": content,
+        "timestamp": datetime.now().isoformat()
+    }
+    course_info = get_course_information(conversation)
+    conversation['messages'].append(user_msg)
+    update_course_information(course_info, content, hits)
+    return user_msg
+
 def determine_next_area_to_explore(conversation):
     """Intelligently determine next framework area based on conversation flow"""
-    messages = conversation.get('messages', [])
-    course_info = extract_course_information(messages)
+    course_info = get_course_information(conversation)
     covered_areas = conversation.get('areas_covered', set())
     
     # Natural progression based on what's been discussed
@@ -185,11 +228,10 @@ def generate_natural_question(area, course_info, conversation_context):
 def should_offer_final_consultation(conversation):
     """Determine if we should offer final consultation before summary"""
     covered_areas = conversation.get('areas_covered', set())
-    messages = conversation.get('messages', [])
-    user_responses = [msg for msg in messages if msg.get('sender') == 'user']
+    user_responses = get_course_information(conversation).get('user_responses', 0)
     
     # Offer consultation after covering 8+ areas or 10+ user responses
-    return len(covered_areas) >= 8 or len(user_responses) >= 10
+    return len(covered_areas) >= 8 or user_responses >= 10
 
 def generate_consultation_offer():
     """Generate final consultation offer"""
@@ -209,39 +251,12 @@ def create_personalized_pdf_report(course_info, session_id):
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
     
-    # Custom styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Title'],
-        fontSize=24,
-        textColor=HexColor('#2E86AB'),
-        spaceAfter=30,
-        alignment=1  # Center
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=HexColor('#A23B72'),
-        spaceBefore=20,
-        spaceAfter=10
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=12,
-        spaceAfter=12,
-        leftIndent=20
-    )
+    body_style = DESIGN_REPORT_STYLES['body']
     
     story = []
     
     # Title
-    story.append(Paragraph("🎉 Your She Is AI Course Design", title_style))
-    story.append(Spacer(1, 20))
+    story.extend(static_flowables(DESIGN_REPORT_SECTIONS, 'title'))
     
     # Personalized opening
     learner_type = course_info.get('learner_type', 'learners').title()
@@ -256,7 +271,7 @@ def create_personalized_pdf_report(course_info, session_id):
     story.append(Spacer(1, 20))
     
     # Course Overview
-    story.append(Paragraph("📋 Your Course Overview", heading_style))
+    story.extend(static_flowables(DESIGN_REPORT_SECTIONS, 'overview'))
     
     if course_info.get('learner_type'):
         story.append(Paragraph(f"<b>Target Learners:</b> {course_info['learner_type'].title()}", body_style))
@@ -275,24 +290,10 @@ def create_personalized_pdf_report(course_info, session_id):
     story.append(Spacer(1, 20))
     
     # Framework Alignment
-    story.append(Paragraph("🌟 She Is AI Framework Alignment", heading_style))
-    
-    framework_points = [
-        "✅ <b>Learner-Centered Design:</b> You've clearly identified your audience and their unique needs",
-        "✅ <b>Practical AI Applications:</b> Your tool selection directly addresses real-world applications", 
-        "✅ <b>Inclusive & Equitable:</b> Your approach welcomes diverse learners and addresses bias",
-        "✅ <b>Ethics-First:</b> You've considered responsible AI use throughout your design",
-        "✅ <b>Future-Ready Skills:</b> Your course prepares learners for evolving AI landscape",
-        "✅ <b>Authentic Assessment:</b> Your evaluation methods are practical and meaningful"
-    ]
-    
-    for point in framework_points:
-        story.append(Paragraph(point, body_style))
-    
-    story.append(Spacer(1, 20))
+    story.extend(static_flowables(DESIGN_REPORT_SECTIONS, 'framework'))
     
     # Why This Course Will Succeed
-    story.append(Paragraph("🚀 Why Your Course Will Transform Lives", heading_style))
+    story.extend(static_flowables(DESIGN_REPORT_SECTIONS, 'success'))
     
     success_factors = f"""
     Your course design stands out because of your thoughtful integration of practical skills with ethical considerations. 
@@ -306,23 +307,10 @@ def create_personalized_pdf_report(course_info, session_id):
     story.append(Spacer(1, 20))
     
     # Implementation Roadmap
-    story.append(Paragraph("📈 Your Implementation Roadmap", heading_style))
-    
-    roadmap = [
-        "<b>Phase 1:</b> Finalize curriculum details and learning materials",
-        "<b>Phase 2:</b> Develop hands-on exercises and assessment rubrics", 
-        "<b>Phase 3:</b> Create inclusive learning environment and bias-checking protocols",
-        "<b>Phase 4:</b> Launch pilot program with feedback collection",
-        "<b>Phase 5:</b> Iterate and scale based on learner outcomes"
-    ]
-    
-    for phase in roadmap:
-        story.append(Paragraph(phase, body_style))
-    
-    story.append(Spacer(1, 30))
+    story.extend(static_flowables(DESIGN_REPORT_SECTIONS, 'roadmap'))
     
     # Closing motivation
-    story.append(Paragraph("💪 You're Ready to Make an Impact", heading_style))
+    story.extend(static_flowables(DESIGN_REPORT_SECTIONS, 'closing'))
     
     closing = f"""
     <b>Your course will genuinely transform careers and lives.</b> By combining practical AI skills with ethical awareness 
@@ -342,12 +330,12 @@ def create_personalized_pdf_report(course_info, session_id):
     
     return buffer
 
-def get_conversational_response(message, conversation):
+def get_conversational_response(message, conversation, hits=None):
     """Generate natural, conversational responses using OpenAI"""
+    if hits is None:
+        hits = KEYWORD_MATCHER.scan(message.lower())
     
-    messages = conversation.get('messages', [])
-    course_info = extract_course_information(messages)
-    covered_areas = conversation.get('areas_covered', set())
+    course_info = get_course_information(conversation)
     
     # Check if we should offer final consultation
     if should_offer_final_consultation(conversation) and not conversation.get('offered_consultation', False):
@@ -355,8 +343,7 @@ def get_conversational_response(message, conversation):
         return generate_consultation_offer()
     
     # Check if user is indicating they're done
-    completion_signals = ['done', 'finished', 'ready', 'wrap up', 'summary', 'that\'s all', 'nothing else']
-    if any(signal in message.lower() for signal in completion_signals):
+    if ('signals', 'completion') in hits:
         return "Perfect! Let me create your comprehensive course design report. You can download it using the Export button above - it will be a detailed PDF celebrating your amazing course design!"
     
     # Determine next area to explore
@@ -375,26 +362,17 @@ def get_conversational_response(message, conversation):
     
     return natural_question
 
-def check_safety_violations(message):
+def check_safety_violations(message, hits=None):
     """Check for inappropriate content"""
-    inappropriate_keywords = [
-        'personal advice', 'relationship', 'medical', 'legal advice', 
-        'politics', 'religion', 'inappropriate', 'harmful'
-    ]
-    
-    message_lower = message.lower()
-    return any(keyword in message_lower for keyword in inappropriate_keywords)
+    if hits is None:
+        hits = KEYWORD_MATCHER.scan(message.lower())
+    return ('signals', 'inappropriate') in hits
 
-def detect_bias_or_exclusion(message):
+def detect_bias_or_exclusion(message, hits=None):
     """Detect potential bias or exclusionary language"""
-    message_lower = message.lower()
-    
-    exclusionary_patterns = [
-        "only for", "not for", "can't handle", "too difficult for",
-        "not smart enough", "exclude", "not suitable for"
-    ]
-    
-    has_bias = any(pattern in message_lower for pattern in exclusionary_patterns)
+    if hits is None:
+        hits = KEYWORD_MATCHER.scan(message.lower())
+    has_bias = ('signals', 'exclusionary') in hits
     
     if has_bias:
         return "I notice some language that might exclude certain learners. The She Is AI framework emphasizes inclusive design that welcomes all learners. How can we make your course more accessible and inclusive?"
@@ -430,19 +408,12 @@ def create_recovery_conversation(session_id, user_message):
         'created_at': datetime.now().isoformat(),
         'messages': [],
         'areas_covered': set(),
+        'course_info': new_course_information(),
         'recovered_session': True
     }
     
-    conversations[session_id] = conversation
-    
     # Add user message
-    user_msg = {
-        "id": str(uuid.uuid4()),
-        "sender": "user",
-        "content": user_message,
-        "timestamp": datetime.now().isoformat()
-    }
-    conversation['messages'].append(user_msg)
+    add_user_message(conversation, user_message)
     
     # Create recovery message
     recovery_content = "Welcome back! I'm here to help you design an amazing AI course using the She Is AI framework. Let's continue building something incredible together! "
@@ -460,15 +431,24 @@ def create_recovery_conversation(session_id, user_message):
     }
     
     conversation['messages'].append(recovery_message)
+    conversations[session_id] = conversation
     
     return conversation, recovery_message
 
+@app.after_request
+def flush_conversations(response):
+    """Write the request's queued session changes in one batch"""
+    conversations.flush()
+    return response
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
         "message": "She Is AI Assistant API is running",
         "status": "healthy",
-        "active_conversations": len(conversations)
+        "active_conversations": len(conversations),
+        "session_store": conversations.stats(),
+        "export_jobs": export_jobs.stats()
     })
 
 @app.route('/api/conversations', methods=['POST'])
@@ -480,11 +460,10 @@ def create_conversation():
         'session_id': session_id,
         'created_at': datetime.now().isoformat(),
         'messages': [],
-        'areas_covered': set()
+        'areas_covered': set(),
+        'course_info': new_course_information()
     }
     
-    conversations[session_id] = conversation
-    
     welcome_message = {
         "id": str(uuid.uuid4()),
         "sender": "assistant",
@@ -494,6 +473,7 @@ def create_conversation():
     }
     
     conversation['messages'].append(welcome_message)
+    conversations[session_id] = conversation
     progress = calculate_progress(conversation)
     
     return jsonify({
@@ -511,8 +491,10 @@ def send_message(session_id):
     if not message:
         return jsonify({"error": "Message cannot be empty"}), 400
     
+    conversation = conversations.get(session_id)
+    
     # Handle missing sessions with recovery
-    if session_id not in conversations:
+    if conversation is None:
         print(f"Session {session_id} not found - creating recovery conversation")
         conversation, recovery_message = create_recovery_conversation(session_id, message)
         
@@ -523,21 +505,17 @@ def send_message(session_id):
             "conversation_update": calculate_progress(conversation)
         })
     
-    conversation = conversations[session_id]
+    # One keyword scan answers every check of this turn
+    hits = KEYWORD_MATCHER.scan(message.lower())
     
     # Add user message
-    user_message = {
-        "id": str(uuid.uuid4()),
-        "sender": "user",
-        "content": message,
-        "timestamp": datetime.now().isoformat()
-    }
-    conversation['messages'].append(user_message)
+    add_user_message(conversation, message, hits)
     
     # Check safety
-    if check_safety_violations(message):
+    if check_safety_violations(message, hits):
         safety_response = get_safety_response()
         conversation['messages'].append(safety_response)
+        conversations[session_id] = conversation
         
         return jsonify({
             "ai_response": safety_response,
@@ -547,7 +525,7 @@ def send_message(session_id):
         })
     
     # Check for bias/exclusion
-    bias_response = detect_bias_or_exclusion(message)
+    bias_response = detect_bias_or_exclusion(message, hits)
     if bias_response:
         ai_response = {
             "id": str(uuid.uuid4()),
@@ -557,6 +535,7 @@ def send_message(session_id):
             "message_type": "bias_correction"
         }
         conversation['messages'].append(ai_response)
+        conversations[session_id] = conversation
         
         return jsonify({
             "ai_response": ai_response,
@@ -566,7 +545,7 @@ def send_message(session_id):
         })
     
     # Generate conversational response
-    ai_content = get_conversational_response(message, conversation)
+    ai_content = get_conversational_response(message, conversation, hits)
     
     ai_response = {
         "id": str(uuid.uuid4()),
@@ -577,6 +556,7 @@ def send_message(session_id):
     }
     
     conversation['messages'].append(ai_response)
+    conversations[session_id] = conversation
     updated_progress = calculate_progress(conversation)
     
     return jsonify({
@@ -589,14 +569,14 @@ def send_message(session_id):
 @app.route('/api/conversations/<session_id>/export', methods=['GET'])
 def export_conversation(session_id):
     """Export personalized PDF report"""
-    if session_id not in conversations:
+    conversation = conversations.get(session_id)
+    if conversation is None:
         return jsonify({
             "error": "Conversation not found",
             "session_id": session_id
         }), 404
     
-    conversation = conversations[session_id]
-    course_info = extract_course_information(conversation.get('messages', []))
+    course_info = get_course_information(conversation)
     
     # Create personalized PDF
     pdf_buffer = create_personalized_pdf_report(course_info, session_id)
@@ -608,6 +588,68 @@ def export_conversation(session_id):
         download_name=f'she_is_ai_course_design_{session_id[:8]}.pdf'
     )
 
+@app.route('/api/conversations/<session_id>/exports', methods=['POST'])
+def enqueue_export(session_id):
+    """Queue the personalized PDF report to render in the background"""
+    conversation = conversations.get(session_id)
+    if conversation is None:
+        return jsonify({
+            "error": "Conversation not found",
+            "session_id": session_id
+        }), 404
+    
+    course_info = get_course_information(conversation)
+    
+    try:
+        job_id = export_jobs.submit(
+            create_personalized_pdf_report,
+            (course_info, session_id),
+            mimetype='application/pdf',
+            download_name=f'she_is_ai_course_design_{session_id[:8]}.pdf'
+        )
+    except ExportQueueFullError:
+        return jsonify({
+            "error": "Too many exports in progress",
+            "message": "Please try again in a moment.",
+            "retry_after": 30
+        }), 503, {"Retry-After": "30"}
+    
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/exports/{job_id}"
+    }), 202, {"Location": f"/api/exports/{job_id}"}
+
+@app.route('/api/exports/<job_id>', methods=['GET'])
+def get_export_job(job_id):
+    """Report a background export's status, or return the PDF once it's ready"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            "error": "Export job not found or expired",
+            "job_id": job_id
+        }), 404
+    
+    if job['status'] == 'done':
+        return send_file(
+            io.BytesIO(job['artifact']),
+            mimetype=job['mimetype'],
+            as_attachment=True,
+            download_name=job['download_name']
+        )
+    
+    if job['status'] == 'failed':
+        return jsonify({
+            "job_id": job_id,
+            "status": "failed",
+            "error": job['error']
+        }), 500
+    
+    return jsonify({
+        "job_id": job_id,
+        "status": job['status']
+    }), 202, {"Retry-After": "1"}
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -616,7 +658,9 @@ def not_found(error):
             "/health",
             "/api/conversations",
             "/api/conversations/<session_id>/messages",
-            "/api/conversations/<session_id>/export"
+            "/api/conversations/<session_id>/export",
+            "/api/conversations/<session_id>/exports",
+            "/api/exports/<job_id>"
         ]
     }), 404
 
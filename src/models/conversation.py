@@ -2,6 +2,13 @@ from datetime import datetime
 import json
 from src.models.user import db
 
+# Insights flagged on a conversation when any user message mentions one of the keywords
+INSIGHT_KEYWORDS = {
+    'beginner': ['beginner'],
+    'practical': ['practical', 'hands-on'],
+    'career': ['career', 'job']
+}
+
 class Conversation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.String(100), unique=True, nullable=False)
@@ -27,8 +34,22 @@ class Conversation(db.Model):
     # Framework coverage tracking
     framework_areas_covered = db.Column(db.Text)  # JSON string
     
+    # Running aggregates kept in step with the message table so summaries never need a scan
+    message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    user_message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    assistant_message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    confidence_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    insight_flags = db.Column(db.Text)  # JSON list of INSIGHT_KEYWORDS keys
+    
     messages = db.relationship('Message', backref='conversation', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_conversation_updated_at', 'updated_at'),
+        db.Index('ix_conversation_status_updated_at', 'status', 'updated_at'),
+        db.Index('ix_conversation_created_at', 'created_at'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -47,9 +68,42 @@ class Conversation(db.Model):
             'current_step': self.current_step,
             'total_steps': self.total_steps,
             'completion_percentage': self.completion_percentage,
-            'framework_areas_covered': json.loads(self.framework_areas_covered) if self.framework_areas_covered else []
+            'framework_areas_covered': json.loads(self.framework_areas_covered) if self.framework_areas_covered else [],
+            'message_count': self.message_count or 0
         }
     
+    def record_messages(self, *messages):
+        """Update the running aggregates for messages being added to this conversation"""
+        insights = self.get_insight_flags()
+        for message in messages:
+            self.message_count = (self.message_count or 0) + 1
+            if message.sender == 'user':
+                self.user_message_count = (self.user_message_count or 0) + 1
+                content = message.content.lower()
+                for insight, keywords in INSIGHT_KEYWORDS.items():
+                    if insight not in insights and any(keyword in content for keyword in keywords):
+                        insights.append(insight)
+            elif message.sender == 'assistant':
+                self.assistant_message_count = (self.assistant_message_count or 0) + 1
+            if message.confidence is not None:
+                self.confidence_sum = (self.confidence_sum or 0.0) + message.confidence
+                self.confidence_count = (self.confidence_count or 0) + 1
+        
+        if insights != self.get_insight_flags():
+            # Keep the INSIGHT_KEYWORDS order regardless of which insight showed up first
+            self.set_insight_flags([insight for insight in INSIGHT_KEYWORDS if insight in insights])
+    
+    def average_confidence(self):
+        return self.confidence_sum / self.confidence_count if self.confidence_count else 0
+    
+    def get_insight_flags(self):
+        if self.insight_flags:
+            return json.loads(self.insight_flags)
+        return []
+    
+    def set_insight_flags(self, insights):
+        self.insight_flags = json.dumps(insights)
+    
     def get_framework_areas_covered(self):
         if self.framework_areas_covered:
             return json.loads(self.framework_areas_covered)
@@ -71,6 +125,11 @@ class Message(db.Model):
     confidence = db.Column(db.Float)
     framework_references = db.Column(db.Text)  # JSON string of referenced framework concepts
     
+    # Every history lookup filters on conversation_id and orders by timestamp
+    __table_args__ = (
+        db.Index('ix_message_conversation_timestamp', 'conversation_id', 'timestamp'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -100,6 +159,10 @@ class FrameworkConcept(db.Model):
     examples = db.Column(db.Text)  # JSON string
     level_adaptations = db.Column(db.Text)  # JSON string
     
+    __table_args__ = (
+        db.Index('ux_framework_concept_name', 'name', unique=True),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -110,3 +173,8 @@ class FrameworkConcept(db.Model):
             'level_adaptations': json.loads(self.level_adaptations) if self.level_adaptations else {}
         }
 
+class SeedState(db.Model):
+    """Checksum of the payload each seeder last applied, so unchanged seeds are skipped"""
+    name = db.Column(db.String(50), primary_key=True)
+    checksum = db.Column(db.String(64), nullable=False)
+    seeded_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,9 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from src.models.conversation import db, Conversation, Message, FrameworkConcept
 from src.utils.conversation_intelligence_simple import AdvancedConversationIntelligence
+from src.utils.conversation_intelligence import AdvancedConversationIntelligence as LLMConversationIntelligence
+from src.utils.keyword_matcher import KEYWORD_MATCHER
+from src.utils.rate_limiter import create_rate_limiter
+from src.utils.export_streams import iter_messages, stream_csv, stream_ndjson
+from src.utils.conversation_history import ConversationHistory
 import uuid
 import json
-from datetime import datetime, timedelta
+import csv
+from datetime import datetime
 import time
 
 conversation_bp = Blueprint('conversation', __name__)
@@ -11,30 +17,14 @@ conversation_bp = Blueprint('conversation', __name__)
 # Initialize enhanced conversation intelligence
 conv_intelligence = AdvancedConversationIntelligence()
 
-# Rate limiting storage (in production, use Redis or similar)
-rate_limit_storage = {}
+# LLM-backed intelligence that streams model tokens as they arrive
+llm_intelligence = LLMConversationIntelligence()
 
-def check_rate_limit(session_id, max_requests=30, window_minutes=5):
-    """Check if user has exceeded rate limit"""
-    current_time = datetime.utcnow()
-    window_start = current_time - timedelta(minutes=window_minutes)
-    
-    if session_id not in rate_limit_storage:
-        rate_limit_storage[session_id] = []
-    
-    # Remove old requests outside the window
-    rate_limit_storage[session_id] = [
-        req_time for req_time in rate_limit_storage[session_id] 
-        if req_time > window_start
-    ]
-    
-    # Check if limit exceeded
-    if len(rate_limit_storage[session_id]) >= max_requests:
-        return False
-    
-    # Add current request
-    rate_limit_storage[session_id].append(current_time)
-    return True
+# Sliding-window rate limiter; RATE_LIMIT_BACKEND=sqlite shares counters across workers
+rate_limiter = create_rate_limiter(max_requests=30, window_seconds=300)
+
+# Most messages a client may send in one batch request
+MAX_BATCH_MESSAGES = 20
 
 @conversation_bp.route('/conversations', methods=['POST'])
 def create_conversation():
@@ -43,7 +33,8 @@ def create_conversation():
     
     conversation = Conversation(session_id=session_id)
     db.session.add(conversation)
-    db.session.commit()
+    # Flush for the conversation id; the welcome message commits with it in one transaction
+    db.session.flush()
     
     # Add welcome message with safety disclaimer
     welcome_content = """Hi! I'm the She Is AI Course Design Assistant. I'm here to help you create an incredible AI course using our proven educational framework. Together, we'll design something that's inclusive, engaging, and creates real career opportunities for your learners.
@@ -63,6 +54,7 @@ Your responses help design your course and aren't stored permanently or shared.
         message_type='welcome'
     )
     db.session.add(welcome_msg)
+    conversation.record_messages(welcome_msg)
     db.session.commit()
     
     return jsonify({
@@ -76,12 +68,13 @@ def send_message(session_id):
     """Send a message in a conversation"""
     
     # Rate limiting check
-    if not check_rate_limit(session_id):
+    allowed, retry_after = rate_limiter.check(session_id)
+    if not allowed:
         return jsonify({
             'error': 'Rate limit exceeded',
             'message': 'Too many requests. Please wait a moment before sending another message.',
-            'retry_after': 60
-        }), 429
+            'retry_after': retry_after
+        }), 429, {'Retry-After': str(retry_after)}
     
     data = request.get_json()
     if not data or 'message' not in data:
@@ -99,8 +92,11 @@ def send_message(session_id):
             'safety_notice': 'Your message contained content that cannot be processed for security reasons.'
         }), 400
     
+    # One keyword scan serves the safety check and the response
+    hits, response_hits = scan_turn(original_message, user_message)
+    
     # Check for safety violations
-    has_violation, safety_message = conv_intelligence.check_safety_violations(original_message)
+    has_violation, safety_message = conv_intelligence.check_safety_violations(original_message, hits)
     
     conversation = Conversation.query.filter_by(session_id=session_id).first()
     if not conversation:
@@ -116,6 +112,7 @@ def send_message(session_id):
             message_type='safety_response'
         )
         db.session.add(safety_msg)
+        conversation.record_messages(safety_msg)
         db.session.commit()
         
         return jsonify({
@@ -124,14 +121,153 @@ def send_message(session_id):
             'privacy_notice': 'Your responses help design your course and aren\'t stored permanently or shared'
         })
     
-    # Get conversation history for analysis
-    conversation_history = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
-    history_data = [{'sender': msg.sender, 'content': msg.content} for msg in conversation_history]
+    # Recent history for analysis; the full count comes from the conversation row
+    history_data = ConversationHistory(conversation)
+    
+    # Stream the response token by token when the client asks for Server-Sent Events
+    if wants_event_stream():
+        analysis = llm_intelligence.analyze_user_message(user_message, history_data)
+        tokens = llm_intelligence.stream_intelligent_response(user_message, conversation, analysis)
+        response_data = conv_intelligence.stream_response(user_message, history_data, token_stream=tokens, hits=response_hits)
+        return Response(
+            stream_with_context(stream_message_turn(conversation, user_message, response_data, len(history_data))),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
     
     # Generate response using conversation intelligence
-    response_data = conv_intelligence.generate_response(user_message, history_data)
+    response_data = conv_intelligence.generate_response(user_message, history_data, response_hits)
     
-    # Save user message
+    # Add privacy reminder periodically
+    ai_response = response_data['content'] + privacy_reminder(len(history_data))
+    
+    user_msg, ai_msg = save_message_turn(conversation, user_message, ai_response, response_data)
+    
+    return jsonify(build_turn_response(conversation, user_msg, ai_msg, response_data))
+
+@conversation_bp.route('/conversations/<session_id>/messages/batch', methods=['POST'])
+def send_message_batch(session_id):
+    """Send several messages in order and persist every resulting turn in one transaction"""
+    data = request.get_json()
+    if not data or not isinstance(data.get('messages'), list) or not data['messages']:
+        return jsonify({'error': 'A non-empty list of messages is required'}), 400
+    if len(data['messages']) > MAX_BATCH_MESSAGES:
+        return jsonify({'error': f'At most {MAX_BATCH_MESSAGES} messages can be sent in one batch'}), 400
+    
+    # Every message in the batch counts against the rate limit
+    allowed, retry_after = rate_limiter.check(session_id, cost=len(data['messages']))
+    if not allowed:
+        return jsonify({
+            'error': 'Rate limit exceeded',
+            'message': 'Too many requests. Please wait a moment before sending another message.',
+            'retry_after': retry_after
+        }), 429, {'Retry-After': str(retry_after)}
+    
+    conversation = Conversation.query.filter_by(session_id=session_id).first()
+    if not conversation:
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    # Load the recent history once and extend it in memory as the batch goes
+    history_data = ConversationHistory(conversation)
+    
+    results = []
+    staged = []
+    try:
+        for original_message in data['messages']:
+            user_message = conv_intelligence.sanitize_input(original_message)
+            if not user_message or len(user_message.strip()) == 0:
+                results.append({'error': 'Invalid message content'})
+                continue
+            
+            hits, response_hits = scan_turn(original_message, user_message)
+            has_violation, safety_message = conv_intelligence.check_safety_violations(original_message, hits)
+            if has_violation:
+                safety_msg = Message(
+                    conversation_id=conversation.id,
+                    sender='assistant',
+                    content=safety_message,
+                    message_type='safety_response'
+                )
+                db.session.add(safety_msg)
+                conversation.record_messages(safety_msg)
+                history_data.append('assistant', safety_message)
+                staged.append((len(results), safety_msg, None, None))
+                results.append(None)
+                continue
+            
+            response_data = conv_intelligence.generate_response(user_message, history_data, response_hits)
+            ai_response = response_data['content'] + privacy_reminder(len(history_data))
+            user_msg, ai_msg = add_message_turn(conversation, user_message, ai_response, response_data)
+            progress = {
+                'current_step': conversation.current_step,
+                'completion_percentage': conversation.completion_percentage,
+                'framework_areas_covered': conversation.get_framework_areas_covered()
+            }
+            staged.append((len(results), user_msg, ai_msg, (response_data, progress)))
+            results.append(None)
+            
+            history_data.append('user', user_message)
+            history_data.append('assistant', ai_response)
+        
+        # Flush assigns ids and timestamps, so the payloads are built without reloading rows after commit
+        db.session.flush()
+        for index, first, ai_msg, turn in staged:
+            if ai_msg is None:
+                results[index] = {'ai_response': first.to_dict(), 'safety_violation': True}
+            else:
+                response_data, progress = turn
+                results[index] = build_turn_response(conversation, first, ai_msg, response_data)
+                results[index]['conversation_update'] = progress
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return jsonify({
+        'results': results,
+        'privacy_notice': 'Your responses help design your course and aren\'t stored permanently or shared'
+    })
+
+def scan_turn(original_message, user_message):
+    """Scan a turn's message once for every keyword table.
+    
+    Returns the hits for the original message, which the safety check reads, and
+    for the sanitized message the response is built from. They are the same scan
+    unless sanitizing did more than trim whitespace, which no keyword spans.
+    """
+    hits = KEYWORD_MATCHER.scan(original_message.lower())
+    if user_message == original_message.strip():
+        return hits, hits
+    return hits, KEYWORD_MATCHER.scan(user_message.lower())
+
+def wants_event_stream():
+    """Check whether the client prefers a Server-Sent Events response"""
+    best = request.accept_mimetypes.best_match(['application/json', 'text/event-stream'])
+    return best == 'text/event-stream'
+
+def privacy_reminder(message_count):
+    """Return the privacy reminder appended to every tenth response"""
+    if message_count > 0 and message_count % 10 == 0:
+        return "\n\n*Privacy reminder: Your responses help design your course and aren't stored permanently or shared.*"
+    return ""
+
+def format_sse(event, data):
+    """Format a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def save_message_turn(conversation, user_message, ai_response, response_data, message_type='response'):
+    """Persist the user message, the AI response and the progress update for one turn in one transaction"""
+    try:
+        user_msg, ai_msg = add_message_turn(conversation, user_message, ai_response, response_data, message_type)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return user_msg, ai_msg
+
+def add_message_turn(conversation, user_message, ai_response, response_data, message_type='response'):
+    """Stage one turn's messages and progress update in the session without committing"""
     user_msg = Message(
         conversation_id=conversation.id,
         sender='user',
@@ -139,24 +275,14 @@ def send_message(session_id):
         intent='course_design',
         confidence=response_data.get('confidence_score', 0.8)
     )
-    db.session.add(user_msg)
-    
-    # Get AI response content
-    ai_response = response_data['content']
-    
-    # Add privacy reminder periodically
-    message_count = len(history_data)
-    if message_count > 0 and message_count % 10 == 0:
-        ai_response += "\n\n*Privacy reminder: Your responses help design your course and aren't stored permanently or shared.*"
-    
-    # Save AI response
     ai_msg = Message(
         conversation_id=conversation.id,
         sender='assistant',
         content=ai_response,
-        message_type='response'
+        message_type=message_type
     )
-    db.session.add(ai_msg)
+    db.session.add_all([user_msg, ai_msg])
+    conversation.record_messages(user_msg, ai_msg)
     
     # Update conversation progress
     conversation.current_step = min(conversation.current_step + 1, conversation.total_steps)
@@ -170,9 +296,11 @@ def send_message(session_id):
         new_areas = current_areas + [framework_area]
         conversation.set_framework_areas_covered(new_areas)
     
-    db.session.commit()
-    
-    return jsonify({
+    return user_msg, ai_msg
+
+def build_turn_response(conversation, user_msg, ai_msg, response_data):
+    """Build the JSON payload returned for a completed turn"""
+    return {
         'user_message': user_msg.to_dict(),
         'ai_response': ai_msg.to_dict(),
         'conversation_update': {
@@ -189,7 +317,30 @@ def send_message(session_id):
         },
         'privacy_notice': 'Your responses help design your course and aren\'t stored permanently or shared',
         'usage_disclaimer': 'This assistant is for educational course design only.'
-    })
+    }
+
+def stream_message_turn(conversation, user_message, response_data, message_count):
+    """Yield response tokens as SSE events and persist the turn once the stream ends"""
+    stream = response_data['stream']
+    chunks = []
+    try:
+        for token in stream:
+            chunks.append(token)
+            yield format_sse('token', {'content': token})
+        
+        reminder = privacy_reminder(message_count)
+        if reminder:
+            chunks.append(reminder)
+            yield format_sse('token', {'content': reminder})
+    except GeneratorExit:
+        # The client disconnected: stop generating upstream and keep what was produced
+        if hasattr(stream, 'close'):
+            stream.close()
+        save_message_turn(conversation, user_message, ''.join(chunks), response_data, message_type='response_interrupted')
+        raise
+    
+    user_msg, ai_msg = save_message_turn(conversation, user_message, ''.join(chunks), response_data)
+    yield format_sse('done', build_turn_response(conversation, user_msg, ai_msg, response_data))
 
 @conversation_bp.route('/conversations/<session_id>/summary', methods=['GET'])
 def get_conversation_summary(session_id):
@@ -225,9 +376,8 @@ def export_conversation(session_id):
     if not conversation:
         return jsonify({'error': 'Conversation not found'}), 404
     
-    messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
-    
     if format_type == 'json':
+        messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
         export_data = {
             'conversation': conversation.to_dict(),
             'messages': [msg.to_dict() for msg in messages],
@@ -237,18 +387,24 @@ def export_conversation(session_id):
         return jsonify(export_data)
     
     elif format_type == 'csv':
-        # Create CSV format
-        csv_data = "timestamp,sender,content,message_type\n"
-        for msg in messages:
-            # Escape quotes and newlines for CSV
-            content = msg.content.replace('"', '""').replace('\n', ' ')
-            csv_data += f'"{msg.timestamp}","{msg.sender}","{content}","{msg.message_type}"\n'
-        
-        return csv_data, 200, {
-            'Content-Type': 'text/csv',
+        # Stream rows straight from the database cursor to the client
+        rows = (
+            [msg.timestamp, msg.sender, msg.content.replace('\n', ' '), msg.message_type]
+            for msg in iter_messages(conversation.id)
+        )
+        csv_stream = stream_csv(
+            ['timestamp', 'sender', 'content', 'message_type'], rows,
+            quoting=csv.QUOTE_ALL, lineterminator='\n'
+        )
+        return Response(stream_with_context(csv_stream), mimetype='text/csv', headers={
             'Content-Disposition': f'attachment; filename="conversation_{session_id}.csv"'
-        }
+        })
+    
+    elif format_type == 'ndjson':
+        records = (msg.to_dict() for msg in iter_messages(conversation.id))
+        return Response(stream_with_context(stream_ndjson(records)), mimetype='application/x-ndjson', headers={
+            'Content-Disposition': f'attachment; filename="conversation_{session_id}.ndjson"'
+        })
     
     else:
-        return jsonify({'error': 'Unsupported format. Use json or csv.'}), 400
-
+        return jsonify({'error': 'Unsupported format. Use json, csv or ndjson.'}), 400
@@ -1,4 +1,5 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, Response, url_for, stream_with_context, current_app
+from sqlalchemy import func
 from src.models.conversation import Conversation, Message
 from src.models.user import db
 import json
@@ -6,42 +7,267 @@ import csv
 import io
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
 from reportlab.lib.units import inch
-from reportlab.lib import colors
+from src.utils.report_templates import (
+    EXPORT_STYLES, EXPORT_SECTIONS, PROGRESS_TABLE_STYLE, static_flowables, coverage_flowable
+)
+from src.utils.export_cache import get_export_cache, export_cache_key
+from src.utils.export_jobs import get_export_job_queue, ExportQueueFullError
+from src.utils.export_streams import (
+    iter_conversation_pages, messages_by_conversation, stream_csv, stream_ndjson, stream_zip
+)
+import hmac
+from types import SimpleNamespace
+from werkzeug.wsgi import wrap_file
+from werkzeug.http import dump_options_header
 import tempfile
 import os
 
 export_bp = Blueprint('export', __name__)
 
+# PDFs up to this size are rendered entirely in memory; larger ones spool to EXPORT_SCRATCH_DIR
+PDF_MEMORY_LIMIT_BYTES = int(os.getenv('EXPORT_PDF_MEMORY_LIMIT_BYTES', 8 * 1024 * 1024))
+EXPORT_SCRATCH_DIR = os.getenv('EXPORT_SCRATCH_DIR') or os.path.join(tempfile.gettempdir(), 'course-design-exports')
+
+# Message rows a bulk CSV export holds in memory before spooling to EXPORT_SCRATCH_DIR, in characters
+BULK_SPOOL_MEMORY_LIMIT = int(os.getenv('EXPORT_BULK_SPOOL_MEMORY_LIMIT', 8 * 1024 * 1024))
+
+def pdf_export_buffer():
+    """Return a memory buffer for a PDF render that spills to an anonymous scratch file past the cap"""
+    os.makedirs(EXPORT_SCRATCH_DIR, mode=0o700, exist_ok=True)
+    return tempfile.SpooledTemporaryFile(max_size=PDF_MEMORY_LIMIT_BYTES, mode='w+b', dir=EXPORT_SCRATCH_DIR)
+
+# Rendered exports keyed on session, latest message, last update and format
+export_cache = get_export_cache()
+
+# Large renders can run on a process pool instead of the request thread
+export_jobs = get_export_job_queue()
+
 @export_bp.route('/conversations/<session_id>/export', methods=['GET'])
 def export_conversation(session_id):
     """Export conversation data in various formats"""
     try:
         format_type = request.args.get('format', 'json').lower()
+        exporter = EXPORTERS.get(format_type)
+        if exporter is None:
+            return jsonify({'error': 'Unsupported format. Use json, csv, or pdf'}), 400
         
-        # Get conversation and messages
+        # Get conversation
         conversation = Conversation.query.filter_by(session_id=session_id).first()
         if not conversation:
             return jsonify({'error': 'Conversation not found'}), 404
-            
-        messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
         
-        if format_type == 'json':
-            return export_as_json(conversation, messages)
-        elif format_type == 'csv':
-            return export_as_csv(conversation, messages)
-        elif format_type == 'pdf':
-            return export_as_pdf(conversation, messages)
+        # The export is addressed by its inputs, so a repeat export is a hash lookup
+        latest_message_id = db.session.query(func.max(Message.id)).filter(
+            Message.conversation_id == conversation.id
+        ).scalar()
+        key = export_cache_key(session_id, latest_message_id, conversation.updated_at, format_type)
+        
+        if request.if_none_match.contains(key):
+            return cached_export_response(key, status=304)
+        
+        cached = export_cache.get(key)
+        if cached is None:
+            messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
+            body, metadata = exporter(conversation, messages)
+            export_cache.set_file(key, body, metadata)
         else:
-            return jsonify({'error': 'Unsupported format. Use json, csv, or pdf'}), 400
+            body, metadata = cached
+        
+        # Large renders and large disk entries are files; stream them rather than reading them in
+        if not isinstance(body, bytes):
+            body = wrap_file(request.environ, body)
+        return cached_export_response(key, body, metadata)
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def attachment_metadata(mimetype, download_name):
+    """Export metadata for a file served as a download"""
+    return {
+        'mimetype': mimetype,
+        'content_disposition': dump_options_header('attachment', {'filename': download_name})
+    }
+
+def cached_export_response(key, body=None, metadata=None, status=200):
+    """Serve a cached export with a strong ETag so clients can revalidate it"""
+    # Files come wrapped by wrap_file, which may be the server's own wsgi.file_wrapper
+    response = Response(body, status=status, mimetype=(metadata or {}).get('mimetype'),
+                        direct_passthrough=body is not None and not isinstance(body, bytes))
+    if metadata and metadata.get('content_disposition'):
+        response.headers['Content-Disposition'] = metadata['content_disposition']
+    response.set_etag(key)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@export_bp.route('/conversations/<session_id>/exports', methods=['POST'])
+def enqueue_export(session_id):
+    """Queue a PDF export to render in the background"""
+    try:
+        format_type = request.args.get('format', 'pdf').lower()
+        if format_type != 'pdf':
+            return jsonify({'error': 'Background exports support the pdf format only'}), 400
+        
+        conversation = Conversation.query.filter_by(session_id=session_id).first()
+        if not conversation:
+            return jsonify({'error': 'Conversation not found'}), 404
+        
+        messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
+        
+        # Workers have no database session, so they get plain snapshots of the rows
+        job_id = export_jobs.submit(
+            render_pdf_bytes,
+            (snapshot_row(conversation), [snapshot_row(msg) for msg in messages]),
+            mimetype='application/pdf',
+            download_name=pdf_download_name(conversation)
+        )
+        
+        status_url = url_for('export.get_export_job', job_id=job_id)
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': status_url
+        }), 202, {'Location': status_url}
+        
+    except ExportQueueFullError:
+        return jsonify({
+            'error': 'Too many exports in progress',
+            'message': 'Please try again in a moment.',
+            'retry_after': 30
+        }), 503, {'Retry-After': '30'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@export_bp.route('/exports/<job_id>', methods=['GET'])
+def get_export_job(job_id):
+    """Report a background export's status, or return the artifact once it's done"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Export job not found or expired'}), 404
+    
+    if job['status'] == 'done':
+        response = send_file(
+            io.BytesIO(job['artifact']),
+            mimetype=job['mimetype'],
+            as_attachment=True,
+            download_name=job['download_name']
+        )
+        response.headers['X-Export-Expires-At'] = datetime.utcfromtimestamp(job['expires_at']).isoformat()
+        return response
+    
+    status = {
+        'job_id': job_id,
+        'status': job['status'],
+        'created_at': datetime.utcfromtimestamp(job['created_at']).isoformat()
+    }
+    if job['status'] == 'failed':
+        status['error'] = job['error']
+        return jsonify(status), 500
+    return jsonify(status), 202, {'Retry-After': '1'}
+
+def snapshot_row(row):
+    """Copy a model's column values into a picklable object with the same attributes"""
+    return SimpleNamespace(**{column.name: getattr(row, column.name) for column in row.__table__.columns})
+
+@export_bp.route('/admin/exports', methods=['GET'])
+def bulk_export():
+    """Stream every conversation created in a date range as NDJSON or a zip of CSVs"""
+    if not admin_authorized():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    try:
+        start = datetime.fromisoformat(request.args['start'])
+        end = datetime.fromisoformat(request.args['end'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'start and end are required ISO dates, e.g. ?start=2024-01-01&end=2024-02-01'}), 400
+    
+    format_type = request.args.get('format', 'ndjson').lower()
+    query = Conversation.query.filter(Conversation.created_at >= start, Conversation.created_at < end)
+    filename = f'course_designs_{start.date().isoformat()}_{end.date().isoformat()}'
+    
+    if format_type == 'ndjson':
+        return Response(stream_with_context(stream_ndjson(bulk_conversation_records(query))),
+                        mimetype='application/x-ndjson',
+                        headers={'Content-Disposition': f'attachment; filename="{filename}.ndjson"'})
+    elif format_type == 'csv':
+        archive = stream_zip(bulk_csv_members(query))
+        return Response(stream_with_context(archive), mimetype='application/zip',
+                        headers={'Content-Disposition': f'attachment; filename="{filename}.zip"'})
+    else:
+        return jsonify({'error': 'Unsupported format. Use ndjson or csv'}), 400
+
+def admin_authorized():
+    """Check the request's bearer token against ADMIN_EXPORT_TOKEN; bulk export is off without one"""
+    expected = os.getenv('ADMIN_EXPORT_TOKEN')
+    if not expected:
+        return False
+    supplied = request.headers.get('Authorization', '')
+    return supplied.startswith('Bearer ') and hmac.compare_digest(supplied[len('Bearer '):], expected)
+
+BULK_CONVERSATION_COLUMNS = [
+    'id', 'session_id', 'created_at', 'updated_at', 'status', 'course_title', 'target_audience',
+    'educational_level', 'duration', 'learning_objectives', 'assessment_approach', 'delivery_method',
+    'current_step', 'total_steps', 'completion_percentage', 'framework_areas_covered'
+]
+
+BULK_MESSAGE_COLUMNS = [
+    'id', 'conversation_id', 'sender', 'content', 'timestamp', 'message_type', 'intent', 'confidence',
+    'framework_references'
+]
+
+def bulk_conversation_records(query):
+    """One NDJSON record per conversation, with its messages inlined"""
+    for page in iter_conversation_pages(query):
+        messages = messages_by_conversation([conversation.id for conversation in page])
+        for conversation in page:
+            record = conversation.to_dict()
+            record['messages'] = [msg.to_dict() for msg in messages[conversation.id]]
+            yield record
+
+def bulk_csv_members(query):
+    """Zip members for the CSV bulk export, read in a single pass over the range.
+
+    A zip is written one member at a time, so message rows are spooled while
+    conversations.csv streams and copied in afterwards; manifest.json carries
+    the row counts taken along the way.
+    """
+    os.makedirs(EXPORT_SCRATCH_DIR, mode=0o700, exist_ok=True)
+    spool = tempfile.SpooledTemporaryFile(
+        max_size=BULK_SPOOL_MEMORY_LIMIT, mode='w+', newline='', encoding='utf-8', dir=EXPORT_SCRATCH_DIR
+    )
+    counts = {'conversations': 0, 'messages': 0}
+    try:
+        yield 'conversations.csv', stream_csv(BULK_CONVERSATION_COLUMNS, bulk_rows(query, spool, counts))
+        spool.seek(0)
+        yield 'messages.csv', iter(lambda: spool.read(io.DEFAULT_BUFFER_SIZE), '')
+        yield 'manifest.json', [json.dumps(counts)]
+    finally:
+        spool.close()
+
+def bulk_rows(query, message_file, counts):
+    """Yield conversation rows, writing each page's message rows to message_file as CSV"""
+    messages_csv = csv.writer(message_file)
+    messages_csv.writerow(BULK_MESSAGE_COLUMNS)
+    for page in iter_conversation_pages(query):
+        messages = messages_by_conversation([conversation.id for conversation in page])
+        for conversation in page:
+            for msg in messages[conversation.id]:
+                messages_csv.writerow([csv_value(getattr(msg, column)) for column in BULK_MESSAGE_COLUMNS])
+                counts['messages'] += 1
+            counts['conversations'] += 1
+            yield [csv_value(getattr(conversation, column)) for column in BULK_CONVERSATION_COLUMNS]
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
 def export_as_json(conversation, messages):
-    """Export conversation as JSON"""
+    """Export conversation as JSON; returns (file, metadata) like every exporter"""
     data = {
         'conversation_metadata': {
             'session_id': conversation.session_id,
@@ -65,21 +291,24 @@ def export_as_json(conversation, messages):
                 'content': msg.content,
                 'timestamp': msg.timestamp.isoformat(),
                 'message_type': msg.message_type,
-                'framework_area': msg.framework_area,
-                'confidence_score': msg.confidence_score
+                'framework_references': msg.get_framework_references(),
+                'confidence_score': msg.confidence
             }
             for msg in messages
         ],
         'framework_coverage': get_framework_coverage(conversation),
         'export_metadata': {
-            'exported_at': datetime.utcnow().isoformat(),
+            # Exports are cached per conversation version, so they carry its time rather than the render's
+            'exported_at': conversation.updated_at.isoformat(),
             'export_format': 'json',
             'total_messages': len(messages),
             'framework': 'She Is AI Educational Framework'
         }
     }
     
-    return jsonify(data)
+    # Serialized as jsonify would, so the cached body matches a plain JSON response
+    body = current_app.json.dumps(data) + '\n'
+    return io.BytesIO(body.encode('utf-8')), {'mimetype': current_app.json.mimetype}
 
 def export_as_csv(conversation, messages):
     """Export conversation as CSV"""
@@ -89,7 +318,7 @@ def export_as_csv(conversation, messages):
     # Write headers
     writer.writerow([
         'Message ID', 'Sender', 'Content', 'Timestamp', 'Message Type', 
-        'Framework Area', 'Confidence Score'
+        'Framework References', 'Confidence Score'
     ])
     
     # Write message data
@@ -100,163 +329,120 @@ def export_as_csv(conversation, messages):
             msg.content,
             msg.timestamp.isoformat(),
             msg.message_type or '',
-            msg.framework_area or '',
-            msg.confidence_score or ''
+            msg.framework_references or '',
+            msg.confidence if msg.confidence is not None else ''
         ])
     
-    output.seek(0)
-    
-    # Create response
-    response = send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'course_design_{conversation.session_id}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    )
-    
-    return response
+    download_name = f'course_design_{conversation.session_id}_{conversation.updated_at.strftime("%Y%m%d_%H%M%S")}.csv'
+    return io.BytesIO(output.getvalue().encode('utf-8')), attachment_metadata('text/csv', download_name)
 
 def export_as_pdf(conversation, messages):
     """Export conversation as PDF"""
-    # Create temporary file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    temp_file.close()
-    
+    # Render in memory; only unusually large reports roll over to the scratch area
+    buffer = pdf_export_buffer()
     try:
-        # Create PDF document
-        doc = SimpleDocTemplate(temp_file.name, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            textColor=colors.HexColor('#2563eb')
-        )
-        story.append(Paragraph("She Is AI Course Design Summary", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Course Information
-        if conversation.course_title:
-            story.append(Paragraph(f"<b>Course Title:</b> {conversation.course_title}", styles['Normal']))
-        if conversation.target_audience:
-            story.append(Paragraph(f"<b>Target Audience:</b> {conversation.target_audience}", styles['Normal']))
-        if conversation.educational_level:
-            story.append(Paragraph(f"<b>Educational Level:</b> {conversation.educational_level}", styles['Normal']))
-        if conversation.duration:
-            story.append(Paragraph(f"<b>Duration:</b> {conversation.duration}", styles['Normal']))
-        
+        build_pdf(buffer, conversation, messages)
+    except Exception:
+        buffer.close()
+        raise
+    
+    # The caller streams the buffer; closing it once the response is sent removes any spilled file
+    buffer.seek(0)
+    return buffer, attachment_metadata('application/pdf', pdf_download_name(conversation))
+
+def pdf_download_name(conversation):
+    return f'course_design_{conversation.session_id}_{conversation.updated_at.strftime("%Y%m%d_%H%M%S")}.pdf'
+
+def render_pdf_bytes(conversation, messages):
+    """Render the conversation PDF and return its bytes; used by background export jobs"""
+    return build_pdf(io.BytesIO(), conversation, messages).getvalue()
+
+def build_pdf(output, conversation, messages):
+    """Render the conversation PDF into a file-like object"""
+    # Create PDF document
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    styles = EXPORT_STYLES
+    story = []
+    
+    # Title
+    story.extend(static_flowables(EXPORT_SECTIONS, 'title'))
+    
+    # Course Information
+    if conversation.course_title:
+        story.append(Paragraph(f"<b>Course Title:</b> {conversation.course_title}", styles['normal']))
+    if conversation.target_audience:
+        story.append(Paragraph(f"<b>Target Audience:</b> {conversation.target_audience}", styles['normal']))
+    if conversation.educational_level:
+        story.append(Paragraph(f"<b>Educational Level:</b> {conversation.educational_level}", styles['normal']))
+    if conversation.duration:
+        story.append(Paragraph(f"<b>Duration:</b> {conversation.duration}", styles['normal']))
+    
+    story.append(Spacer(1, 20))
+    
+    # Progress Information
+    progress_data = [
+        ['Progress Metric', 'Value'],
+        ['Completion Percentage', f"{conversation.completion_percentage}%"],
+        ['Current Step', f"{conversation.current_step} of {conversation.total_steps}"],
+        ['Status', conversation.status.title()],
+        ['Created', conversation.created_at.strftime('%Y-%m-%d %H:%M')],
+        ['Last Updated', conversation.updated_at.strftime('%Y-%m-%d %H:%M')]
+    ]
+    
+    progress_table = Table(progress_data)
+    progress_table.setStyle(PROGRESS_TABLE_STYLE)
+    
+    story.extend(static_flowables(EXPORT_SECTIONS, 'progress'))
+    story.append(progress_table)
+    story.append(Spacer(1, 20))
+    
+    # Learning Objectives
+    if conversation.learning_objectives:
+        story.extend(static_flowables(EXPORT_SECTIONS, 'objectives'))
+        story.append(Paragraph(conversation.learning_objectives, styles['normal']))
         story.append(Spacer(1, 20))
-        
-        # Progress Information
-        progress_data = [
-            ['Progress Metric', 'Value'],
-            ['Completion Percentage', f"{conversation.completion_percentage}%"],
-            ['Current Step', f"{conversation.current_step} of {conversation.total_steps}"],
-            ['Status', conversation.status.title()],
-            ['Created', conversation.created_at.strftime('%Y-%m-%d %H:%M')],
-            ['Last Updated', conversation.updated_at.strftime('%Y-%m-%d %H:%M')]
-        ]
-        
-        progress_table = Table(progress_data)
-        progress_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f1f5f9')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(Paragraph("<b>Course Design Progress</b>", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        story.append(progress_table)
+    
+    # Assessment Approach
+    if conversation.assessment_approach:
+        story.extend(static_flowables(EXPORT_SECTIONS, 'assessment'))
+        story.append(Paragraph(conversation.assessment_approach, styles['normal']))
         story.append(Spacer(1, 20))
+    
+    # Conversation Messages
+    story.extend(static_flowables(EXPORT_SECTIONS, 'conversation'))
+    
+    for msg in messages:
+        if msg.sender == 'user':
+            story.append(Paragraph(f"<b>You:</b> {msg.content}", styles['user_message']))
+        else:
+            story.append(Paragraph(f"<b>Assistant:</b> {msg.content}", styles['assistant_message']))
         
-        # Learning Objectives
-        if conversation.learning_objectives:
-            story.append(Paragraph("<b>Learning Objectives</b>", styles['Heading2']))
-            story.append(Spacer(1, 10))
-            story.append(Paragraph(conversation.learning_objectives, styles['Normal']))
-            story.append(Spacer(1, 20))
-        
-        # Assessment Approach
-        if conversation.assessment_approach:
-            story.append(Paragraph("<b>Assessment Approach</b>", styles['Heading2']))
-            story.append(Spacer(1, 10))
-            story.append(Paragraph(conversation.assessment_approach, styles['Normal']))
-            story.append(Spacer(1, 20))
-        
-        # Conversation Messages
-        story.append(Paragraph("<b>Design Conversation</b>", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        
-        for msg in messages:
-            if msg.sender == 'user':
-                sender_style = ParagraphStyle(
-                    'UserMessage',
-                    parent=styles['Normal'],
-                    leftIndent=20,
-                    textColor=colors.HexColor('#1e40af'),
-                    fontName='Helvetica-Bold'
-                )
-                story.append(Paragraph(f"<b>You:</b> {msg.content}", sender_style))
-            else:
-                sender_style = ParagraphStyle(
-                    'AssistantMessage',
-                    parent=styles['Normal'],
-                    leftIndent=20,
-                    textColor=colors.HexColor('#059669')
-                )
-                story.append(Paragraph(f"<b>Assistant:</b> {msg.content}", sender_style))
-            
-            story.append(Spacer(1, 10))
-        
-        # Framework Coverage
-        story.append(Spacer(1, 20))
-        story.append(Paragraph("<b>Framework Coverage Analysis</b>", styles['Heading2']))
         story.append(Spacer(1, 10))
-        
-        coverage = get_framework_coverage(conversation)
-        for area, status in coverage.items():
-            status_text = "✓ Covered" if status else "○ Not Covered"
-            story.append(Paragraph(f"<b>{area}:</b> {status_text}", styles['Normal']))
-        
-        # Footer
-        story.append(Spacer(1, 30))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.grey,
-            alignment=1  # Center alignment
-        )
-        story.append(Paragraph(
-            f"Generated by She Is AI Course Design Assistant on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>"
-            "This document contains your course design session summary.",
-            footer_style
-        ))
-        
-        # Build PDF
-        doc.build(story)
-        
-        # Send file
-        return send_file(
-            temp_file.name,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=f'course_design_{conversation.session_id}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-        )
-        
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
+    
+    # Framework Coverage
+    story.extend(static_flowables(EXPORT_SECTIONS, 'coverage'))
+    
+    coverage = get_framework_coverage(conversation)
+    for area, status in coverage.items():
+        story.append(coverage_flowable(area, status))
+    
+    # Footer; dated by the conversation, not the render, since cached copies are served as is
+    story.append(Spacer(1, 30))
+    story.append(Paragraph(
+        f"Generated by She Is AI Course Design Assistant, as of {conversation.updated_at.strftime('%Y-%m-%d %H:%M:%S')}<br/>"
+        "This document contains your course design session summary.",
+        styles['footer']
+    ))
+    
+    # Build PDF
+    doc.build(story)
+    return output
+
+EXPORTERS = {
+    'json': export_as_json,
+    'csv': export_as_csv,
+    'pdf': export_as_pdf
+}
 
 def get_framework_coverage(conversation):
     """Analyze framework coverage based on conversation"""
@@ -281,10 +467,8 @@ def get_conversation_summary(session_id):
         conversation = Conversation.query.filter_by(session_id=session_id).first()
         if not conversation:
             return jsonify({'error': 'Conversation not found'}), 404
-            
-        messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
         
-        # Generate structured summary
+        # Generate structured summary from the conversation's running aggregates
         summary = {
             'course_design': {
                 'title': conversation.course_title,
@@ -302,14 +486,14 @@ def get_conversation_summary(session_id):
             },
             'framework_analysis': get_framework_coverage(conversation),
             'quality_metrics': {
-                'total_messages': len(messages),
-                'user_messages': len([m for m in messages if m.sender == 'user']),
-                'assistant_messages': len([m for m in messages if m.sender == 'assistant']),
-                'average_confidence': calculate_average_confidence(messages),
+                'total_messages': conversation.message_count,
+                'user_messages': conversation.user_message_count,
+                'assistant_messages': conversation.assistant_message_count,
+                'average_confidence': conversation.average_confidence(),
                 'completeness_score': calculate_completeness_score(conversation)
             },
-            'key_insights': extract_key_insights(messages),
-            'recommendations': generate_recommendations(conversation, messages)
+            'key_insights': extract_key_insights(conversation),
+            'recommendations': generate_recommendations(conversation)
         }
         
         return jsonify(summary)
@@ -317,10 +501,11 @@ def get_conversation_summary(session_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def calculate_average_confidence(messages):
-    """Calculate average confidence score from messages"""
-    confidence_scores = [m.confidence_score for m in messages if m.confidence_score is not None]
-    return sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+KEY_INSIGHTS = {
+    'beginner': "Course targets beginner-level learners",
+    'practical': "Emphasis on practical, hands-on learning",
+    'career': "Focus on career development and job readiness"
+}
 
 def calculate_completeness_score(conversation):
     """Calculate how complete the course design is"""
@@ -335,23 +520,11 @@ def calculate_completeness_score(conversation):
     completed_fields = sum(1 for field in required_fields if field)
     return (completed_fields / len(required_fields)) * 100
 
-def extract_key_insights(messages):
-    """Extract key insights from the conversation"""
-    # This would use NLP to extract key themes and insights
-    # For now, return basic insights
-    user_messages = [m.content for m in messages if m.sender == 'user']
-    
-    insights = []
-    if any('beginner' in msg.lower() for msg in user_messages):
-        insights.append("Course targets beginner-level learners")
-    if any('practical' in msg.lower() or 'hands-on' in msg.lower() for msg in user_messages):
-        insights.append("Emphasis on practical, hands-on learning")
-    if any('career' in msg.lower() or 'job' in msg.lower() for msg in user_messages):
-        insights.append("Focus on career development and job readiness")
-    
-    return insights
+def extract_key_insights(conversation):
+    """Describe the insights flagged on the conversation as its messages were saved"""
+    return [KEY_INSIGHTS[insight] for insight in conversation.get_insight_flags() if insight in KEY_INSIGHTS]
 
-def generate_recommendations(conversation, messages):
+def generate_recommendations(conversation):
     """Generate recommendations for course improvement"""
     recommendations = []
     
@@ -1,8 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from src.models.conversation import Conversation, Message
+from src.utils.export_streams import iter_messages, stream_csv, stream_ndjson
 import json
 import csv
-import io
 from datetime import datetime
 
 export_bp = Blueprint('export', __name__)
@@ -13,21 +13,22 @@ def export_conversation(session_id):
     try:
         format_type = request.args.get('format', 'json').lower()
         
-        # Get conversation and messages
+        # Get conversation; CSV and NDJSON stream their messages instead of loading them up front
         conversation = Conversation.query.filter_by(session_id=session_id).first()
         if not conversation:
             return jsonify({'error': 'Conversation not found'}), 404
-            
-        messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
         
         if format_type == 'json':
+            messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
             return export_as_json(conversation, messages)
         elif format_type == 'csv':
-            return export_as_csv(conversation, messages)
+            return export_as_csv(conversation)
+        elif format_type == 'ndjson':
+            return export_as_ndjson(conversation)
         elif format_type == 'pdf':
-            return jsonify({'error': 'PDF export temporarily unavailable. Please use JSON or CSV format.'}), 400
+            return jsonify({'error': 'PDF export temporarily unavailable. Please use JSON, CSV or NDJSON format.'}), 400
         else:
-            return jsonify({'error': 'Unsupported format. Use json or csv'}), 400
+            return jsonify({'error': 'Unsupported format. Use json, csv or ndjson'}), 400
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -57,8 +58,8 @@ def export_as_json(conversation, messages):
                 'content': msg.content,
                 'timestamp': msg.timestamp.isoformat(),
                 'message_type': msg.message_type,
-                'framework_area': msg.framework_area,
-                'confidence_score': msg.confidence_score
+                'framework_references': msg.get_framework_references(),
+                'confidence_score': msg.confidence
             }
             for msg in messages
         ],
@@ -73,38 +74,38 @@ def export_as_json(conversation, messages):
     
     return jsonify(data)
 
-def export_as_csv(conversation, messages):
-    """Export conversation as CSV"""
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write headers
-    writer.writerow([
-        'Message ID', 'Sender', 'Content', 'Timestamp', 'Message Type', 
-        'Framework Area', 'Confidence Score'
-    ])
-    
-    # Write message data
-    for msg in messages:
-        writer.writerow([
+def export_as_csv(conversation):
+    """Export conversation as a streamed CSV download"""
+    rows = (
+        [
             msg.id,
             msg.sender,
             msg.content,
             msg.timestamp.isoformat(),
             msg.message_type or '',
-            msg.framework_area or '',
-            msg.confidence_score or ''
-        ])
-    
-    output.seek(0)
-    csv_data = output.getvalue()
+            msg.framework_references or '',
+            msg.confidence if msg.confidence is not None else ''
+        ]
+        for msg in iter_messages(conversation.id)
+    )
+    csv_stream = stream_csv([
+        'Message ID', 'Sender', 'Content', 'Timestamp', 'Message Type', 
+        'Framework References', 'Confidence Score'
+    ], rows)
     
-    response = jsonify({
-        'csv_data': csv_data,
-        'filename': f'course_design_{conversation.session_id}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    filename = f'course_design_{conversation.session_id}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    return Response(stream_with_context(csv_stream), mimetype='text/csv', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"'
     })
+
+def export_as_ndjson(conversation):
+    """Export conversation messages as streamed newline-delimited JSON"""
+    records = (msg.to_dict() for msg in iter_messages(conversation.id))
     
-    return response
+    filename = f'course_design_{conversation.session_id}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.ndjson'
+    return Response(stream_with_context(stream_ndjson(records)), mimetype='application/x-ndjson', headers={
+        'Content-Disposition': f'attachment; filename="{filename}"'
+    })
 
 def get_framework_coverage(conversation):
     """Analyze framework coverage based on conversation"""
@@ -127,10 +128,8 @@ def get_conversation_summary(session_id):
         conversation = Conversation.query.filter_by(session_id=session_id).first()
         if not conversation:
             return jsonify({'error': 'Conversation not found'}), 404
-            
-        messages = Message.query.filter_by(conversation_id=conversation.id).order_by(Message.timestamp).all()
         
-        # Generate structured summary
+        # Generate structured summary from the conversation's running aggregates
         summary = {
             'course_design': {
                 'title': conversation.course_title,
@@ -148,14 +147,14 @@ def get_conversation_summary(session_id):
             },
             'framework_analysis': get_framework_coverage(conversation),
             'quality_metrics': {
-                'total_messages': len(messages),
-                'user_messages': len([m for m in messages if m.sender == 'user']),
-                'assistant_messages': len([m for m in messages if m.sender == 'assistant']),
-                'average_confidence': calculate_average_confidence(messages),
+                'total_messages': conversation.message_count,
+                'user_messages': conversation.user_message_count,
+                'assistant_messages': conversation.assistant_message_count,
+                'average_confidence': conversation.average_confidence(),
                 'completeness_score': calculate_completeness_score(conversation)
             },
-            'key_insights': extract_key_insights(messages),
-            'recommendations': generate_recommendations(conversation, messages)
+            'key_insights': extract_key_insights(conversation),
+            'recommendations': generate_recommendations(conversation)
         }
         
         return jsonify(summary)
@@ -163,10 +162,11 @@ def get_conversation_summary(session_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def calculate_average_confidence(messages):
-    """Calculate average confidence score from messages"""
-    confidence_scores = [m.confidence_score for m in messages if m.confidence_score is not None]
-    return sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+KEY_INSIGHTS = {
+    'beginner': "Course targets beginner-level learners",
+    'practical': "Emphasis on practical, hands-on learning",
+    'career': "Focus on career development and job readiness"
+}
 
 def calculate_completeness_score(conversation):
     """Calculate how complete the course design is"""
@@ -181,21 +181,11 @@ def calculate_completeness_score(conversation):
     completed_fields = sum(1 for field in required_fields if field)
     return (completed_fields / len(required_fields)) * 100
 
-def extract_key_insights(messages):
-    """Extract key insights from the conversation"""
-    user_messages = [m.content for m in messages if m.sender == 'user']
-    
-    insights = []
-    if any('beginner' in msg.lower() for msg in user_messages):
-        insights.append("Course targets beginner-level learners")
-    if any('practical' in msg.lower() or 'hands-on' in msg.lower() for msg in user_messages):
-        insights.append("Emphasis on practical, hands-on learning")
-    if any('career' in msg.lower() or 'job' in msg.lower() for msg in user_messages):
-        insights.append("Focus on career development and job readiness")
-    
-    return insights
+def extract_key_insights(conversation):
+    """Describe the insights flagged on the conversation as its messages were saved"""
+    return [KEY_INSIGHTS[insight] for insight in conversation.get_insight_flags() if insight in KEY_INSIGHTS]
 
-def generate_recommendations(conversation, messages):
+def generate_recommendations(conversation):
     """Generate recommendations for course improvement"""
     recommendations = []
     
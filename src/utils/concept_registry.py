@@ -0,0 +1,139 @@
+import os
+import time
+import threading
+from sqlalchemy.orm import Session
+from src.models.conversation import db, FrameworkConcept, SeedState
+
+# seed_state row whose checksum versions the catalog
+FRAMEWORK_CONCEPTS_SEED = 'framework_concepts'
+
+class ConceptRegistry:
+    """Read-mostly, in-memory index of the framework concept catalog.
+
+    The catalog is read from the database and its JSON columns parsed once, on
+    first use (or an explicit ``load()`` at startup); after that every lookup is
+    a dict access. Concepts are indexed by category, by lower-cased name and by
+    educational level. The returned dicts are shared, so callers must not
+    mutate them. ``invalidate()`` drops the index so the next lookup reloads it;
+    seeding calls it whenever the catalog changes.
+
+    Seeding from another process can't reach this one, so the index also
+    remembers the ``seed_state`` checksum it was loaded with and, at most every
+    ``check_interval`` seconds, compares it with the database's and reloads
+    when they differ. Reads go through a short-lived session of their own, so
+    they never touch the caller's transaction.
+    """
+
+    def __init__(self, check_interval=30.0):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._generation = 0
+        self._checked_at = 0.0
+        self.counters = {'loads': 0, 'invalidations': 0, 'version_checks': 0, 'stale_reloads': 0}
+
+    def _read_version(self, session):
+        return session.query(SeedState.checksum).filter_by(name=FRAMEWORK_CONCEPTS_SEED).scalar()
+
+    def load(self):
+        """(Re)build the index from the database; needs an app context"""
+        with self._lock:
+            generation = self._generation
+        with Session(db.engine) as session:
+            version = self._read_version(session)
+            concepts = [concept.to_dict() for concept in session.query(FrameworkConcept).order_by(FrameworkConcept.id)]
+
+        by_name = {}
+        by_category = {}
+        by_level = {}
+        for concept in concepts:
+            by_name[concept['name'].lower()] = concept
+            by_category.setdefault(concept['category'], []).append(concept)
+            for level, adaptation in concept['level_adaptations'].items():
+                by_level.setdefault(level, {})[concept['name']] = adaptation
+
+        index = {
+            'version': version,
+            'all': tuple(concepts),
+            'by_name': by_name,
+            'by_category': {category: tuple(items) for category, items in by_category.items()},
+            'by_level': by_level
+        }
+        with self._lock:
+            # An invalidate() during the read means this snapshot may predate the change
+            if generation == self._generation:
+                self._index = index
+                self._checked_at = time.monotonic()
+            self.counters['loads'] += 1
+        return index
+
+    def invalidate(self):
+        """Forget the loaded catalog so the next lookup reads it again"""
+        with self._lock:
+            self._index = None
+            self._generation += 1
+            self.counters['invalidations'] += 1
+
+    def _loaded(self):
+        index = self._index
+        if index is None:
+            return self.load()
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return index
+
+        with self._lock:
+            # One thread checks per interval; the rest keep using the current index
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return index
+            self._checked_at = time.monotonic()
+            self.counters['version_checks'] += 1
+        with Session(db.engine) as session:
+            version = self._read_version(session)
+        if version == index['version']:
+            return index
+        with self._lock:
+            self.counters['stale_reloads'] += 1
+        return self.load()
+
+    def all(self):
+        return self._loaded()['all']
+
+    def get(self, name):
+        """Return the concept called name (case-insensitive), or None"""
+        return self._loaded()['by_name'].get((name or '').lower())
+
+    def by_category(self, category):
+        return self._loaded()['by_category'].get(category, ())
+
+    def categories(self):
+        return list(self._loaded()['by_category'])
+
+    def for_level(self, level):
+        """Return {concept name: adaptation} for an educational level"""
+        return self._loaded()['by_level'].get((level or '').lower(), {})
+
+    def adaptation(self, name, level):
+        """Return how concept name adapts to an educational level, or None"""
+        concept = self.get(name)
+        if concept is None:
+            return None
+        return concept['level_adaptations'].get((level or '').lower())
+
+    def stats(self):
+        index = self._index
+        stats = dict(self.counters)
+        stats['concepts'] = len(index['all']) if index is not None else 0
+        stats['loaded'] = index is not None
+        stats['version'] = index['version'] if index is not None else None
+        return stats
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+def get_concept_registry():
+    """Return the process-wide concept registry"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ConceptRegistry(float(os.getenv('CONCEPT_REGISTRY_CHECK_SECONDS', 30)))
+        return _default_registry
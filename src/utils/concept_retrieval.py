@@ -0,0 +1,81 @@
+import re
+import math
+import heapq
+import threading
+from collections import Counter
+from src.utils.concept_registry import get_concept_registry
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'for', 'from', 'how', 'i', 'in',
+    'is', 'it', 'my', 'of', 'on', 'or', 'our', 'so', 'that', 'the', 'their', 'this', 'to', 'we',
+    'what', 'with', 'you', 'your'
+))
+
+def tokenize(text):
+    """Lowercase terms with stopwords dropped and plural endings folded"""
+    terms = []
+    for term in _TOKEN.findall((text or '').lower()):
+        if term in STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith('s') and not term.endswith('ss'):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+class ConceptIndex:
+    """BM25 index over framework concept names, descriptions and examples.
+
+    Every posting's BM25 weight is computed when the index is built, so a
+    query is a handful of dict lookups and additions: well under a
+    millisecond for the catalog's few dozen concepts. Names count
+    ``name_weight`` times so a concept mentioned by name ranks first.
+    """
+
+    def __init__(self, concepts, k1=1.5, b=0.75, name_weight=2):
+        self.concepts = concepts
+
+        postings = {}
+        lengths = []
+        for position, concept in enumerate(concepts):
+            terms = (
+                tokenize(concept['name']) * name_weight
+                + tokenize(concept['description'])
+                + tokenize(' '.join(concept['examples']))
+            )
+            lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                postings.setdefault(term, []).append((position, frequency))
+
+        average_length = sum(lengths) / len(lengths) if lengths else 0
+        self._weights = {}
+        for term, documents in postings.items():
+            idf = math.log(1 + (len(concepts) - len(documents) + 0.5) / (len(documents) + 0.5))
+            self._weights[term] = [
+                (position, idf * frequency * (k1 + 1) / (
+                    frequency + k1 * (1 - b + b * lengths[position] / average_length)
+                ))
+                for position, frequency in documents
+            ]
+
+    def search(self, query, k=3):
+        """Return up to k concepts relevant to query, best first"""
+        scores = {}
+        for term in set(tokenize(query)):
+            for position, weight in self._weights.get(term, ()):
+                scores[position] = scores.get(position, 0.0) + weight
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [self.concepts[position] for position, _ in best]
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+def get_concept_index():
+    """Return an index over the registry's current catalog, rebuilt whenever the registry reloads"""
+    global _default_index
+    concepts = get_concept_registry().all()
+    with _default_index_lock:
+        if _default_index is None or _default_index.concepts is not concepts:
+            _default_index = ConceptIndex(concepts)
+        return _default_index
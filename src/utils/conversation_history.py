@@ -0,0 +1,64 @@
+from collections.abc import Sequence
+from src.models.conversation import Message
+
+# Messages loaded per turn; older context is only read if something indexes into it
+HISTORY_WINDOW = 20
+
+class ConversationHistory(Sequence):
+    """Read-only view of a conversation's messages as ``{'sender', 'content'}`` dicts.
+
+    ``len()`` comes from ``Conversation.message_count`` and only the last
+    ``window`` messages are loaded up front, so the usual accesses (counting,
+    ``history[-4:]``) cost one bounded query however long the session is.
+    Indexing further back loads the older messages once, on demand.
+    """
+
+    def __init__(self, conversation, window=HISTORY_WINDOW):
+        self.conversation = conversation
+        self.window = window
+        self._count = conversation.message_count or 0
+        self._recent = self._load(limit=window)
+        self._older = None if len(self._recent) == window else []
+
+    def _load(self, limit=None, before_id=None):
+        query = Message.query.filter_by(conversation_id=self.conversation.id)
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+        query = query.order_by(Message.timestamp.desc(), Message.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return [{'id': msg.id, 'sender': msg.sender, 'content': msg.content} for msg in reversed(query.all())]
+
+    def older(self):
+        """Messages before the loaded window, oldest first"""
+        if self._older is None:
+            self._older = self._load(before_id=self._recent[0]['id'])
+        return self._older
+
+    def recent(self, limit=None):
+        """The last limit messages (default: the whole window) without touching older context"""
+        return self._recent if limit is None else self._recent[-limit:]
+
+    def append(self, sender, content):
+        """Track a message added during this request"""
+        self._recent.append({'id': None, 'sender': sender, 'content': content})
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        # Positions past the stored count (messages appended this request) map onto the window too
+        offset = self._count - len(self._recent)
+        if isinstance(index, slice):
+            positions = range(self._count)[index]
+            if not positions or min(positions) >= offset:
+                return [self._recent[position - offset] for position in positions]
+            return [self[position] for position in positions]
+
+        position = range(self._count)[index]
+        if position >= offset:
+            return self._recent[position - offset]
+        older = self.older()
+        # The stored count can drift from the table; index older context from its own end
+        return older[len(older) - (offset - position)]
@@ -1,6 +1,7 @@
 import json
 import re
 from datetime import datetime
+from src.utils.keyword_matcher import KEYWORD_MATCHER
 
 class AdvancedConversationIntelligence:
     def __init__(self):
@@ -15,13 +16,14 @@ class AdvancedConversationIntelligence:
             "Career Relevance"
         ]
         
-    def generate_response(self, user_message, conversation_context=None):
-        """Generate a framework-guided response"""
+    def generate_response(self, user_message, conversation_context=None, hits=None):
+        """Generate a framework-guided response; hits is the message's KEYWORD_MATCHER scan if the caller has it"""
         
         # Simple demo responses based on keywords
-        user_lower = user_message.lower()
+        if hits is None:
+            hits = KEYWORD_MATCHER.scan(user_message.lower())
         
-        if any(word in user_lower for word in ['beginner', 'new', 'start']):
+        if ('topic', 'beginner') in hits:
             response = """Perfect! Creating an AI course for beginners is exactly what the She Is AI framework excels at. 
 
 Let's start by understanding your learners better. Our framework emphasizes inclusive design from the very beginning.
@@ -33,7 +35,7 @@ Can you tell me more about:
 
 This will help us design a course that's truly accessible and engaging for your specific audience."""
             
-        elif any(word in user_lower for word in ['machine learning', 'ml', 'algorithms']):
+        elif ('topic', 'machine_learning') in hits:
             response = """Excellent choice! Machine learning is a fantastic entry point into AI, and our framework has specific approaches for making complex technical concepts accessible.
 
 For ML courses, the She Is AI methodology emphasizes:
@@ -49,7 +51,7 @@ What specific ML topics are you most excited to include? For example:
 
 Also, what's the end goal for your learners? Are they aiming for specific careers or just general understanding?"""
             
-        elif any(word in user_lower for word in ['career', 'job', 'professional']):
+        elif ('topic', 'career') in hits:
             response = """That's fantastic! Career-focused AI education is at the heart of the She Is AI framework. We believe in creating real pathways to opportunity.
 
 Let's design something that truly prepares learners for the job market. Our framework includes:
@@ -78,29 +80,29 @@ The more specific you can be, the better I can help you leverage our framework's
 
         return {
             'content': response,
-            'framework_area': self._detect_framework_area(user_message),
+            'framework_area': self._detect_framework_area(user_message, hits),
             'confidence_score': 0.85,
             'message_type': 'framework_guidance'
         }
     
-    def _detect_framework_area(self, message):
-        """Detect which framework area the message relates to"""
-        message_lower = message.lower()
+    def stream_response(self, user_message, conversation_context=None, token_stream=None, hits=None):
+        """Generate a framework-guided response whose content is yielded as text chunks.
         
-        if any(word in message_lower for word in ['audience', 'learner', 'student', 'who']):
-            return "Target Audience Analysis"
-        elif any(word in message_lower for word in ['beginner', 'advanced', 'level', 'experience']):
-            return "Educational Level Alignment"
-        elif any(word in message_lower for word in ['goal', 'objective', 'outcome', 'learn']):
-            return "Learning Objectives"
-        elif any(word in message_lower for word in ['assess', 'test', 'evaluation', 'grade']):
-            return "Assessment Strategy"
-        elif any(word in message_lower for word in ['career', 'job', 'professional', 'work']):
-            return "Career Relevance"
-        elif any(word in message_lower for word in ['structure', 'organize', 'sequence', 'order']):
-            return "Course Structure"
-        else:
-            return "General Framework Guidance"
+        token_stream, when given, supplies the content instead (e.g. tokens from the
+        LLM as they arrive); the framework area and confidence still come from here.
+        """
+        response_data = self.generate_response(user_message, conversation_context, hits)
+        content = response_data.pop('content')
+        
+        # Demo responses are canned, so the whole text is a single chunk
+        response_data['stream'] = token_stream if token_stream is not None else iter([content])
+        return response_data
+    
+    def _detect_framework_area(self, message, hits=None):
+        """Detect which framework area the message relates to"""
+        if hits is None:
+            hits = KEYWORD_MATCHER.scan(message.lower())
+        return KEYWORD_MATCHER.first_category(hits, 'area') or "General Framework Guidance"
     
     def extract_course_info(self, conversation_messages):
         """Extract structured course information from conversation"""
@@ -116,16 +118,17 @@ The more specific you can be, the better I can help you leverage our framework's
         # Simple keyword extraction from user messages
         user_messages = [msg['content'] for msg in conversation_messages if msg.get('sender') == 'user']
         all_text = ' '.join(user_messages).lower()
+        hits = KEYWORD_MATCHER.scan(all_text)
         
         # Extract basic information
-        if 'beginner' in all_text:
+        if ('course_info', 'beginner') in hits:
             course_info['educational_level'] = 'Beginner'
             course_info['target_audience'] = 'Beginners interested in AI'
         
-        if 'machine learning' in all_text or 'ml' in all_text:
+        if ('course_info', 'machine_learning') in hits:
             course_info['title'] = 'Introduction to Machine Learning'
             
-        if 'career' in all_text or 'job' in all_text:
+        if ('course_info', 'career') in hits:
             course_info['learning_objectives'] = 'Prepare learners for AI careers'
             
         return course_info
@@ -144,19 +147,13 @@ The more specific you can be, the better I can help you leverage our framework's
             
         return clean_input.strip()
     
-    def check_safety_violations(self, message):
+    def check_safety_violations(self, message, hits=None):
         """Check for safety violations"""
-        message_lower = message.lower()
-        
         # Simple keyword-based safety check
-        inappropriate_keywords = [
-            'hack', 'illegal', 'harmful', 'dangerous', 'weapon',
-            'violence', 'hate', 'discrimination'
-        ]
-        
-        for keyword in inappropriate_keywords:
-            if keyword in message_lower:
-                return True, f"I focus specifically on educational course design using the She Is AI framework. Let's keep our conversation centered on creating inclusive, effective AI education."
+        if hits is None:
+            hits = KEYWORD_MATCHER.scan(message.lower())
+        if ('safety', 'inappropriate') in hits:
+            return True, f"I focus specifically on educational course design using the She Is AI framework. Let's keep our conversation centered on creating inclusive, effective AI education."
                 
         return False, None
 
@@ -0,0 +1,194 @@
+import os
+import shutil
+import tempfile
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+def export_cache_key(session_id, latest_message_id, updated_at, format_type):
+    """Content address of an export: it changes whenever the conversation or its messages do"""
+    payload = json.dumps([
+        session_id,
+        latest_message_id,
+        updated_at.isoformat() if updated_at else None,
+        format_type
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ExportCache:
+    """Thread-safe two-tier cache for rendered exports.
+
+    Entries are ``(body, metadata)`` pairs, where metadata is a small dict such
+    as the mimetype and download name. Recent entries are kept in an LRU bounded
+    by total bytes; when ``disk_dir`` is given, every entry is also written
+    there so a restart, a memory eviction or another worker costs a file read
+    instead of a re-render. The disk tier is bounded by bytes as well and trimmed
+    oldest first, and its directory is created private to the current user.
+
+    Entries larger than ``max_entry_bytes`` never live in memory: ``set_file``
+    copies them from the render's file to disk in chunks, and ``get`` returns
+    them as an open file positioned at the body, for the caller to stream and close.
+    """
+
+    def __init__(self, max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024, disk_dir=None,
+                 max_entry_bytes=4 * 1024 * 1024):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_memory_bytes)
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'disk_hits': 0, 'evictions': 0}
+
+        self._disk_sizes = OrderedDict()
+        self._disk_bytes = 0
+        if disk_dir:
+            # Exports hold whole conversations, so only this user may read them
+            os.makedirs(disk_dir, mode=0o700, exist_ok=True)
+            # Rebuild the disk index oldest first so trimming keeps the newest exports
+            paths = [os.path.join(disk_dir, name) for name in os.listdir(disk_dir) if name.endswith('.export')]
+            for path in sorted(paths, key=os.path.getmtime):
+                self._disk_sizes[os.path.basename(path)[:-len('.export')]] = os.path.getsize(path)
+            self._disk_bytes = sum(self._disk_sizes.values())
+
+    def get(self, key):
+        """Return (body, metadata) for key, or None on a miss; large bodies are open files"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            if isinstance(entry[0], bytes):
+                self._store(key, entry)
+            self.counters['hits'] += 1
+            self.counters['disk_hits'] += 1
+            return entry
+
+    def set(self, key, body, metadata):
+        """Cache a rendered export"""
+        entry = (body, metadata)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, metadata, lambda f: f.write(body))
+
+    def set_file(self, key, source, metadata):
+        """Cache an export rendered into a seekable file, leaving the file rewound for serving"""
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        source.seek(0)
+        if size <= self.max_entry_bytes:
+            self.set(key, source.read(), metadata)
+        else:
+            self._write_disk(key, metadata, lambda f: shutil.copyfileobj(source, f))
+        source.seek(0)
+
+    def _store(self, key, entry):
+        size = len(entry[0])
+        if size > self.max_entry_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._entries[key] = entry
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.counters['evictions'] += 1
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.export')
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        with self._disk_lock:
+            # Other workers may have written the file, so the index isn't authoritative for reads
+            try:
+                f = open(self._path(key), 'rb')
+            except OSError:
+                self._disk_bytes -= self._disk_sizes.pop(key, 0)
+                return None
+            try:
+                size = os.fstat(f.fileno()).st_size
+                metadata = json.loads(f.readline())
+                # Small bodies are read and promoted to memory; large ones stay on disk
+                body = f if size - f.tell() > self.max_entry_bytes else f.read()
+            except (OSError, ValueError):
+                f.close()
+                self._disk_bytes -= self._disk_sizes.pop(key, 0)
+                return None
+            if body is not f:
+                f.close()
+            self._disk_bytes += size - self._disk_sizes.pop(key, 0)
+            self._disk_sizes[key] = size
+        return body, metadata
+
+    def _write_disk(self, key, metadata, write_body):
+        if not self.disk_dir:
+            return
+        header = json.dumps(metadata).encode('utf-8') + b'\n'
+        with self._disk_lock:
+            # Write under a unique temporary name so readers never see a partial
+            # file and other workers rendering the same key don't share it
+            fd, temp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(header)
+                    write_body(f)
+                    size = f.tell()
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+            self._disk_bytes += size - self._disk_sizes.pop(key, 0)
+            self._disk_sizes[key] = size
+
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk_sizes) > 1:
+                stale, size = self._disk_sizes.popitem(last=False)
+                self._disk_bytes -= size
+                try:
+                    os.remove(self._path(stale))
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Report hit/miss counters and occupancy"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+            stats['memory_bytes'] = self._memory_bytes
+        with self._disk_lock:
+            stats['disk_entries'] = len(self._disk_sizes)
+            stats['disk_bytes'] = self._disk_bytes
+        return stats
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_export_cache():
+    """Return the process-wide export cache configured from the environment"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ExportCache(
+                max_memory_bytes=int(os.getenv('EXPORT_CACHE_MEMORY_BYTES', 32 * 1024 * 1024)),
+                max_disk_bytes=int(os.getenv('EXPORT_CACHE_DISK_BYTES', 256 * 1024 * 1024)),
+                # Exports only touch disk where EXPORT_CACHE_DIR says they may
+                disk_dir=os.getenv('EXPORT_CACHE_DIR') or None,
+                max_entry_bytes=int(os.getenv('EXPORT_CACHE_MAX_ENTRY_BYTES', 4 * 1024 * 1024))
+            )
+        return _default_cache
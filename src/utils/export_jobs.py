@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import uuid
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+class ExportQueueFullError(Exception):
+    """Raised by submit when the worker already has max_pending jobs in flight"""
+
+def run_export_job(render, args, store=None, job_id=None):
+    """Worker entry point: render an export and return its bytes.
+
+    With a shared store the job is marked running from the worker, so a poll
+    that lands on any web worker sees it.
+    """
+    if store is not None:
+        store.update(job_id, status='running')
+    artifact = render(*args)
+    if hasattr(artifact, 'getvalue'):
+        artifact = artifact.getvalue()
+    return artifact
+
+class InMemoryJobStore:
+    """Process-local job records and artifacts, for development and single-worker deployments"""
+
+    shared = False
+
+    def __init__(self):
+        self._jobs = {}
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    def create(self, job):
+        with self._lock:
+            self._jobs[job['job_id']] = dict(job)
+
+    def update(self, job_id, artifact=None, **fields):
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            self._jobs[job_id].update(fields)
+            if artifact is not None:
+                self._artifacts[job_id] = artifact
+
+    def load(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def load_artifact(self, job_id):
+        with self._lock:
+            return self._artifacts.get(job_id)
+
+    def delete(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._artifacts.pop(job_id, None)
+
+    def jobs(self):
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+class DiskJobStore:
+    """Job records and artifacts as files in a directory every worker on the host can reach.
+
+    Each job is a small JSON record, ``<job_id>.job``, plus the rendered bytes in
+    ``<job_id>.artifact`` once it's done. Files are written under a unique
+    temporary name and renamed into place, so readers never see a partial one.
+    The directory is created private to the current user; the store is
+    picklable so pool workers can update records themselves.
+    """
+
+    shared = True
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, job_id, suffix):
+        # Job ids are uuid4 hex; anything else can't name a file in the directory
+        if not job_id.isalnum():
+            raise ValueError(f'Invalid job id {job_id!r}')
+        return os.path.join(self.directory, f'{job_id}.{suffix}')
+
+    def _write(self, path, data):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def create(self, job):
+        self._write(self._path(job['job_id'], 'job'), json.dumps(job).encode('utf-8'))
+
+    def update(self, job_id, artifact=None, **fields):
+        job = self.load(job_id)
+        if job is None:
+            return
+        # The artifact lands before the record that says it's there
+        if artifact is not None:
+            self._write(self._path(job_id, 'artifact'), artifact)
+        job.update(fields)
+        self._write(self._path(job_id, 'job'), json.dumps(job).encode('utf-8'))
+
+    def load(self, job_id):
+        try:
+            with open(self._path(job_id, 'job'), 'rb') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def load_artifact(self, job_id):
+        try:
+            with open(self._path(job_id, 'artifact'), 'rb') as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+    def delete(self, job_id):
+        for suffix in ('artifact', 'job'):
+            try:
+                os.remove(self._path(job_id, suffix))
+            except (OSError, ValueError):
+                pass
+
+    def jobs(self):
+        names = [name[:-len('.job')] for name in os.listdir(self.directory) if name.endswith('.job')]
+        return [job for job in (self.load(job_id) for job_id in names) if job is not None]
+
+class ExportJobQueue:
+    """Render exports on a process pool and keep the artifacts for a while.
+
+    ``submit`` takes a picklable render function and arguments, so callers
+    snapshot whatever they need from the database or session store before the
+    job leaves the request. Job records and finished artifacts live in
+    ``store``; with a ``DiskJobStore`` every web worker can report on and serve
+    any job, whichever worker rendered it. Artifacts expire ``artifact_ttl``
+    seconds after the job completes; unfinished jobs never expire. Expired
+    artifacts are purged every ``purge_interval`` seconds by a background
+    thread, started on the first submit, and before ``stats`` counts jobs. Each worker
+    runs at most ``max_pending`` jobs at a time and ``submit`` raises
+    ``ExportQueueFullError`` beyond that. The pool is created on first use so
+    importing the module is cheap.
+    """
+
+    def __init__(self, max_workers=2, artifact_ttl=900, purge_interval=60, max_pending=20, store=None):
+        self.max_workers = max_workers
+        self.artifact_ttl = artifact_ttl
+        self.max_pending = max_pending
+        self.store = store or InMemoryJobStore()
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.purge_interval = purge_interval
+        self._purger = None
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'expired': 0, 'rejected': 0}
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, render, args, mimetype, download_name):
+        """Queue a render and return its job id"""
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'mimetype': mimetype,
+            'download_name': download_name,
+            'created_at': time.time(),
+            'finished_at': None,
+            'error': None
+        }
+
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                self.counters['rejected'] += 1
+                raise ExportQueueFullError(f'{len(self._futures)} export jobs are already pending')
+            self.store.create(job)
+            self.counters['submitted'] += 1
+            shared_store = self.store if self.store.shared else None
+            future = self._pool().submit(run_export_job, render, args, shared_store, job_id)
+            self._futures[job_id] = future
+
+        self._start_purger()
+        future.add_done_callback(lambda done: self._finish(job_id, done))
+        return job_id
+
+    def _finish(self, job_id, future):
+        finished_at = time.time()
+        try:
+            artifact = future.result()
+        except Exception as e:
+            self.store.update(job_id, status='failed', finished_at=finished_at, error=str(e) or e.__class__.__name__)
+            outcome = 'failed'
+        else:
+            self.store.update(job_id, artifact=artifact, status='done', finished_at=finished_at)
+            outcome = 'completed'
+        with self._lock:
+            self._futures.pop(job_id, None)
+            self.counters[outcome] += 1
+
+    def get(self, job_id):
+        """Return a snapshot of a job, or None if it's unknown or expired"""
+        job = self.store.load(job_id)
+        if job is None:
+            return None
+        if self._expired(job, time.time()):
+            self.store.delete(job_id)
+            with self._lock:
+                self.counters['expired'] += 1
+            return None
+
+        with self._lock:
+            future = self._futures.get(job_id)
+        if job['status'] == 'queued' and future is not None and future.running():
+            job['status'] = 'running'
+        if job['status'] == 'done':
+            job['artifact'] = self.store.load_artifact(job_id)
+            if job['artifact'] is None:
+                # Expired and removed by another worker between the two reads
+                return None
+        if job['finished_at']:
+            job['expires_at'] = job['finished_at'] + self.artifact_ttl
+        return job
+
+    def _expired(self, job, now):
+        return job['finished_at'] is not None and now - job['finished_at'] >= self.artifact_ttl
+
+    def purge_expired(self):
+        """Drop artifacts whose TTL has passed"""
+        now = time.time()
+        expired = [job['job_id'] for job in self.store.jobs() if self._expired(job, now)]
+        for job_id in expired:
+            self.store.delete(job_id)
+        with self._lock:
+            self.counters['expired'] += len(expired)
+
+    def _start_purger(self):
+        """Start the background purger on first submit (after any worker fork)"""
+        if self._purger is not None or not self.purge_interval:
+            return
+        with self._lock:
+            if self._purger is not None:
+                return
+            self._purger = threading.Thread(target=self._purge_loop, name='export-job-purger', daemon=True)
+            self._purger.start()
+
+    def _purge_loop(self):
+        while True:
+            time.sleep(self.purge_interval)
+            try:
+                self.purge_expired()
+            except Exception as e:
+                print(f"Export artifact purge failed: {e}")
+
+    def stats(self):
+        """Report job counters, how many jobs are held and how many this worker is running"""
+        self.purge_expired()
+        jobs = self.store.jobs()
+        with self._lock:
+            stats = dict(self.counters)
+            stats['pending'] = len(self._futures)
+        stats['jobs'] = len(jobs)
+        stats['max_pending'] = self.max_pending
+        stats['max_workers'] = self.max_workers
+        stats['shared_store'] = self.store.shared
+        return stats
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+def get_export_job_queue():
+    """Return the process-wide export job queue configured from the environment.
+
+    Jobs are shared between workers through EXPORT_JOBS_DIR, or a ``jobs``
+    directory under EXPORT_CACHE_DIR; with neither set they stay in this process.
+    """
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            jobs_dir = os.getenv('EXPORT_JOBS_DIR')
+            if not jobs_dir and os.getenv('EXPORT_CACHE_DIR'):
+                jobs_dir = os.path.join(os.getenv('EXPORT_CACHE_DIR'), 'jobs')
+            _default_queue = ExportJobQueue(
+                max_workers=int(os.getenv('EXPORT_JOB_WORKERS', 2)),
+                artifact_ttl=float(os.getenv('EXPORT_ARTIFACT_TTL_SECONDS', 900)),
+                purge_interval=float(os.getenv('EXPORT_ARTIFACT_PURGE_SECONDS', 60)),
+                max_pending=int(os.getenv('EXPORT_JOB_MAX_PENDING', 20)),
+                store=DiskJobStore(jobs_dir) if jobs_dir else None
+            )
+        return _default_queue
@@ -0,0 +1,91 @@
+import csv
+import json
+import zipfile
+from src.models.conversation import Conversation, Message
+
+# Rows fetched per round trip while streaming an export
+EXPORT_CHUNK_SIZE = 500
+
+# Conversations per keyset page in bulk exports
+BULK_EXPORT_PAGE_SIZE = 200
+
+# Compressed bytes buffered before a zip archive yields a chunk
+ZIP_CHUNK_BYTES = 64 * 1024
+
+class _LineBuffer:
+    """File-like sink that hands back whatever csv.writer writes instead of storing it"""
+
+    def write(self, value):
+        return value
+
+def iter_messages(conversation_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield a conversation's messages in order, loading chunk_size rows at a time"""
+    return Message.query.filter_by(conversation_id=conversation_id).order_by(
+        Message.timestamp, Message.id
+    ).yield_per(chunk_size)
+
+def iter_conversation_pages(query, page_size=BULK_EXPORT_PAGE_SIZE):
+    """Yield pages of conversations from query using keyset pagination on Conversation.id"""
+    last_id = 0
+    while True:
+        page = query.filter(Conversation.id > last_id).order_by(Conversation.id).limit(page_size).all()
+        if not page:
+            return
+        yield page
+        last_id = page[-1].id
+
+def messages_by_conversation(conversation_ids):
+    """Load the messages of several conversations in one query, grouped by conversation id"""
+    grouped = {conversation_id: [] for conversation_id in conversation_ids}
+    messages = Message.query.filter(Message.conversation_id.in_(conversation_ids)).order_by(
+        Message.conversation_id, Message.timestamp, Message.id
+    ).yield_per(EXPORT_CHUNK_SIZE)
+    for msg in messages:
+        grouped[msg.conversation_id].append(msg)
+    return grouped
+
+def stream_csv(header, rows, **writer_options):
+    """Yield CSV text one row at a time, so memory use doesn't grow with the export"""
+    writer = csv.writer(_LineBuffer(), **writer_options)
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+def stream_ndjson(records):
+    """Yield one JSON document per line"""
+    for record in records:
+        yield json.dumps(record) + '\n'
+
+class _ChunkSink:
+    """Write-only, unseekable file that collects bytes until they're drained"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+def stream_zip(members):
+    """Yield a zip archive built from (name, text_chunks) members as it's compressed"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, text_chunks in members:
+            # Sizes aren't known up front, so allow members past the 2 GiB zip32 limit
+            with archive.open(name, 'w', force_zip64=True) as member:
+                for text in text_chunks:
+                    member.write(text.encode('utf-8'))
+                    if sink.size >= ZIP_CHUNK_BYTES:
+                        yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,231 @@
+import re
+from functools import lru_cache
+
+class KeywordMatcher:
+    """Find every keyword from a set of keyword tables in a single scan of the text.
+
+    Tables are given as ``{table_name: {category: [keywords]}}``. The keywords are
+    compiled once into a trie-shaped regular expression (an Aho-Corasick style
+    automaton run by the C regex engine), so a scan walks the text once instead of
+    once per keyword. Matching keeps plain substring semantics, i.e. a keyword is
+    reported exactly when ``keyword in text`` would be true.
+    """
+
+    def __init__(self, tables, cache_size=256):
+        self.tables = tables
+        self._categories = {}
+        for table, categories in tables.items():
+            for category, keywords in categories.items():
+                for keyword in keywords:
+                    self._categories.setdefault(keyword, []).append((table, category))
+
+        keywords = list(self._categories)
+
+        # Keywords that start where a longer keyword starts are its prefixes
+        self._prefixes = {
+            keyword: [other for other in keywords if keyword.startswith(other)]
+            for keyword in keywords
+        }
+
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        pattern = self._trie_pattern(trie)
+        self._pattern = re.compile(f'(?=({pattern}))', re.DOTALL) if pattern else None
+
+        # The same message is usually checked by several callers in one request
+        self.scan = lru_cache(maxsize=cache_size)(self._scan)
+
+    def _trie_pattern(self, node):
+        """Render a trie node as a regex that prefers the longest keyword"""
+        alternatives = [
+            re.escape(char) + self._trie_pattern(child)
+            for char, child in sorted(node.items()) if char != ''
+        ]
+        if not alternatives:
+            return ''
+
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        if '' in node:
+            return f'(?:{body})?'
+        return body
+
+    def _scan(self, text):
+        """Return {(table, category): frozenset(keywords)} for every keyword found in text"""
+        found = set()
+        if self._pattern is not None and text:
+            for match in self._pattern.finditer(text):
+                found.update(self._prefixes[match.group(1)])
+
+        hits = {}
+        for keyword in found:
+            for key in self._categories[keyword]:
+                hits.setdefault(key, set()).add(keyword)
+
+        return {key: frozenset(keywords) for key, keywords in hits.items()}
+
+    def first_category(self, hits, table, categories=None):
+        """Return the first category of a table (in table order) that had a hit"""
+        for category in categories if categories is not None else self.tables[table]:
+            if (table, category) in hits:
+                return category
+        return None
+
+    def first_keyword(self, hits, table, category):
+        """Return the first keyword of a category (in table order) that had a hit"""
+        matched = hits.get((table, category))
+        if not matched:
+            return None
+        for keyword in self.tables[table][category]:
+            if keyword in matched:
+                return keyword
+        return None
+
+# Keywords that trigger different response types in the LLM intelligence
+TRIGGER_KEYWORDS = {
+    'other_frameworks': ['montessori', 'waldorf', 'reggio', 'traditional', 'other framework', 'different approach'],
+    'non_framework_topics': ['marketing', 'sales', 'budget', 'funding', 'legal', 'compliance', 'technology stack'],
+    'too_technical': ['api', 'database', 'server', 'coding', 'programming', 'technical implementation'],
+    'vague_responses': ['good', 'fine', 'okay', 'yes', 'no', 'maybe', 'not sure'],
+    'custom_solutions': ['custom', 'unique', 'different', 'special', 'non-standard', 'outside framework'],
+    'reverse_engineering': ['how were you built', 'system prompt', 'technical details', 'how you work', 'ai model', 'prompt engineering'],
+    'ip_extraction': ['code structure', 'implementation', 'architecture', 'backend', 'development process', 'sources'],
+    'malicious_use': ['copy framework', 'steal', 'plagiarize', 'discriminatory', 'harmful', 'biased content'],
+    'system_probing': ['what model', 'how do you generate', 'decision tree', 'response pattern', 'limitations'],
+    'inappropriate_content': ['discriminatory', 'racist', 'sexist', 'harmful', 'offensive', 'hate', 'violence'],
+    'personal_info': ['my name is', 'i live at', 'my email', 'my phone', 'my address', 'social security', 'credit card'],
+    'non_educational': ['dating', 'romance', 'personal relationship', 'medical advice', 'legal advice', 'financial advice'],
+    'privacy_violation': ['other users', 'previous conversations', 'user data', 'personal information', 'private details']
+}
+
+INTENT_KEYWORDS = {
+    'help_request': ['help', 'explain', 'what is', 'how do', 'can you tell me'],
+    'confirmation': ['yes', 'no', 'maybe', 'not sure'],
+    'level_specification': ['elementary', 'secondary', 'college', 'professional', 'corporate'],
+    'detailed_response': ['example', 'specifically', 'for instance'],
+    'clarification_needed': ['confused', 'unclear', 'don\'t understand']
+}
+
+FRAMEWORK_KEYWORDS = {
+    'philosophy': ['inclusive', 'bias-free', 'accessible', 'community', 'career', 'universal', 'portfolio-driven'],
+    'lesson_structure': ['lesson', 'structure', 'opening', 'practice', 'reflection', 'ritual', 'objectives', 'closing'],
+    'content_progression': ['ai concepts', 'ethics', 'bias recognition', 'skills', 'women\'s role', 'progression'],
+    'teaching_methods': ['visual', 'hands-on', 'collaborative', 'problem-based', 'portfolio'],
+    'assessment': ['assessment', 'portfolio', 'evaluation', 'rubric', 'authentic', 'peer evaluation'],
+    'bias_elimination': ['bias', 'equity', 'inclusion', 'fair', 'diverse', 'systematic', 'elimination'],
+    'facilitator_training': ['facilitator', 'training', 'competencies', 'professional development'],
+    'support_framework': ['support', 'community', 'mentorship', 'resources', 'ongoing']
+}
+
+MESSAGE_KEYWORDS = {
+    'vague': ['good', 'fine', 'okay', 'yes', 'no', 'maybe', 'not sure', 'idk', 'dunno'],
+    'depth': ['example', 'specific'],
+    'course': ['course', 'class'],
+    'title': ['called', 'titled'],
+    'objectives': ['learn', 'goal', 'objective']
+}
+
+AUDIENCE_KEYWORDS = {
+    'audience': ['students', 'learners', 'professionals', 'teachers', 'women', 'beginners', 'adults', 'children']
+}
+
+LEVEL_KEYWORDS = {
+    'elementary': ['elementary', 'primary', 'kids', 'children', 'ages 5', 'ages 6', 'ages 7', 'ages 8', 'ages 9', 'ages 10', 'ages 11'],
+    'secondary': ['secondary', 'high school', 'middle school', 'teenagers', 'teens', 'ages 12', 'ages 13', 'ages 14', 'ages 15', 'ages 16', 'ages 17', 'ages 18'],
+    'college': ['college', 'university', 'undergraduate', 'students', 'ages 18', 'ages 19', 'ages 20', 'ages 21', 'ages 22'],
+    'professional': ['professional', 'workforce', 'career', 'job', 'workplace', 'employees'],
+    'corporate': ['corporate', 'enterprise', 'company', 'organization', 'business']
+}
+
+DELIVERY_KEYWORDS = {
+    'online': ['online', 'virtual', 'remote', 'digital'],
+    'in-person': ['in-person', 'face-to-face', 'classroom', 'physical'],
+    'hybrid': ['hybrid', 'blended', 'mixed', 'combination'],
+    'self-paced': ['self-paced', 'asynchronous', 'flexible', 'own pace']
+}
+
+# Topics that select one of the simple engine's canned framework responses
+RESPONSE_TOPIC_KEYWORDS = {
+    'beginner': ['beginner', 'new', 'start'],
+    'machine_learning': ['machine learning', 'ml', 'algorithms'],
+    'career': ['career', 'job', 'professional']
+}
+
+FRAMEWORK_AREA_KEYWORDS = {
+    "Target Audience Analysis": ['audience', 'learner', 'student', 'who'],
+    "Educational Level Alignment": ['beginner', 'advanced', 'level', 'experience'],
+    "Learning Objectives": ['goal', 'objective', 'outcome', 'learn'],
+    "Assessment Strategy": ['assess', 'test', 'evaluation', 'grade'],
+    "Career Relevance": ['career', 'job', 'professional', 'work'],
+    "Course Structure": ['structure', 'organize', 'sequence', 'order']
+}
+
+COURSE_INFO_KEYWORDS = {
+    'beginner': ['beginner'],
+    'machine_learning': ['machine learning', 'ml'],
+    'career': ['career', 'job']
+}
+
+INAPPROPRIATE_KEYWORDS = [
+    'hack', 'illegal', 'harmful', 'dangerous', 'weapon',
+    'violence', 'hate', 'discrimination'
+]
+
+# Course details and safety signals read by the standalone app (src/main.py)
+LEARNER_KEYWORDS = {
+    'professionals': ['professional'],
+    'students': ['student'],
+    'career changers': ['career chang']
+}
+
+AI_TOOLS = ['n8n', 'gamma', 'canva', 'chatgpt', 'gemini', 'manus', 'claude']
+
+GOAL_KEYWORDS = {
+    'foundational understanding': ['foundation', 'basic'],
+    'practical application': ['hands-on', 'practical']
+}
+
+ASSESSMENT_KEYWORDS = {
+    'interactive assessment': ['quiz', 'assessment']
+}
+
+COMPLETION_SIGNALS = ['done', 'finished', 'ready', 'wrap up', 'summary', 'that\'s all', 'nothing else']
+
+INAPPROPRIATE_TOPIC_KEYWORDS = [
+    'personal advice', 'relationship', 'medical', 'legal advice', 
+    'politics', 'religion', 'inappropriate', 'harmful'
+]
+
+EXCLUSIONARY_PATTERNS = [
+    "only for", "not for", "can't handle", "too difficult for",
+    "not smart enough", "exclude", "not suitable for"
+]
+
+# Every table compiled once into a single automaton, so one scan of a message
+# answers the keyword checks of the whole turn
+KEYWORD_MATCHER = KeywordMatcher({
+    'trigger': TRIGGER_KEYWORDS,
+    'intent': INTENT_KEYWORDS,
+    'framework': FRAMEWORK_KEYWORDS,
+    'message': MESSAGE_KEYWORDS,
+    'audience': AUDIENCE_KEYWORDS,
+    'level': LEVEL_KEYWORDS,
+    'delivery': DELIVERY_KEYWORDS,
+    'topic': RESPONSE_TOPIC_KEYWORDS,
+    'area': FRAMEWORK_AREA_KEYWORDS,
+    'course_info': COURSE_INFO_KEYWORDS,
+    'safety': {'inappropriate': INAPPROPRIATE_KEYWORDS},
+    'learner': LEARNER_KEYWORDS,
+    'tools': {tool: [tool] for tool in AI_TOOLS},
+    'goals': GOAL_KEYWORDS,
+    'assessment': ASSESSMENT_KEYWORDS,
+    'signals': {
+        'completion': COMPLETION_SIGNALS,
+        'inappropriate': INAPPROPRIATE_TOPIC_KEYWORDS,
+        'exclusionary': EXCLUSIONARY_PATTERNS
+    }
+})
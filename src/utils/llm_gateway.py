@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+class LLMGatewayError(Exception):
+    """Raised when an LLM request can't be completed"""
+
+class CircuitOpenError(LLMGatewayError):
+    """Raised without touching the network while the upstream is marked degraded"""
+
+class GatewayBusyError(LLMGatewayError):
+    """Raised when no concurrency slot frees up within the queue timeout"""
+
+class UpstreamUnavailableError(LLMGatewayError):
+    """Raised when the upstream is overloaded, erroring or too slow (429, 5xx, deadline)"""
+
+def is_upstream_failure(error):
+    """Connection errors, timeouts, 429 and 5xx count against the breaker.
+
+    Anything else (a 4xx such as a bad request or key, an unparseable body) is
+    about this request, and shouldn't cut the upstream off for everyone.
+    """
+    return isinstance(error, (
+        UpstreamUnavailableError,
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError
+    ))
+
+class CircuitBreaker:
+    """Stop calling a failing upstream for a while after repeated failures.
+
+    closed -> open after ``failure_threshold`` consecutive failures; open ->
+    half-open after ``reset_timeout`` seconds, letting one trial request through;
+    the trial's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Return True if a request may be sent upstream now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self):
+        """Give back a half-open trial slot that was never used"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {'state': self.state, 'consecutive_failures': self.failures}
+
+class LLMGateway:
+    """Chat-completion client shared by every request in the process.
+
+    Keeps a pooled keep-alive HTTP session, caps concurrent upstream calls with a
+    semaphore, gives every call a hard deadline and trips a circuit breaker when
+    the upstream keeps failing, so callers can go straight to their fallback.
+    A call that finds every slot taken waits at most ``queue_timeout`` seconds
+    (0 rejects at once) rather than holding its request thread for the whole
+    deadline.
+    The endpoint comes from ``api_base``, which makes it easy to point at a local
+    mock server.
+    """
+
+    def __init__(self, api_key=None, api_base=None, max_concurrency=8, timeout=30.0,
+                 connect_timeout=5.0, failure_threshold=5, reset_timeout=30.0, queue_timeout=0.5):
+        self.api_key = api_key
+        self.api_base = (api_base or 'https://api.openai.com/v1').rstrip('/')
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._stats_lock = threading.Lock()
+        self.counters = {'requests': 0, 'failures': 0, 'rejected': 0, 'short_circuited': 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.counters[name] += 1
+
+    def _post(self, payload, deadline, stream=False):
+        """Send one chat-completion request within the deadline"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMGatewayError('Deadline exceeded before the request was sent')
+
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+
+        response = self.session.post(
+            f'{self.api_base}/chat/completions',
+            data=json.dumps(payload),
+            headers=headers,
+            timeout=(min(self.connect_timeout, remaining), remaining),
+            stream=stream
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            response.close()
+            raise UpstreamUnavailableError(f'Upstream returned {response.status_code}')
+        if response.status_code >= 400:
+            response.close()
+            raise LLMGatewayError(f'Request rejected with {response.status_code}')
+        return response
+
+    def _record_error(self, error):
+        self._count('failures')
+        if is_upstream_failure(error):
+            self.breaker.record_failure()
+        else:
+            # The upstream answered; don't hold a half-open trial on its behalf
+            self.breaker.release_trial()
+
+    def _acquire(self, deadline):
+        """Take a concurrency slot, or fail fast if the upstream is degraded or saturated"""
+        if not self.breaker.allow_request():
+            self._count('short_circuited')
+            raise CircuitOpenError('LLM upstream is temporarily unavailable')
+
+        # Wait briefly for a slot; a saturated gateway sheds load instead of queueing
+        wait = max(0, min(self.queue_timeout, deadline - time.monotonic()))
+        if not self._semaphore.acquire(timeout=wait):
+            # Saturation is our own limit, not an upstream failure
+            self._count('rejected')
+            self.breaker.release_trial()
+            raise GatewayBusyError('Too many concurrent LLM requests')
+        self._count('requests')
+
+    def chat_completion(self, messages, model='gpt-4', max_tokens=500, temperature=0.7, timeout=None):
+        """Return the completion text for a list of chat messages"""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        self._acquire(deadline)
+        try:
+            response = self._post({
+                'model': model,
+                'messages': messages,
+                'max_tokens': max_tokens,
+                'temperature': temperature
+            }, deadline)
+            content = response.json()['choices'][0]['message']['content']
+        except Exception as e:
+            self._record_error(e)
+            if isinstance(e, LLMGatewayError):
+                raise
+            raise LLMGatewayError(str(e)) from e
+        finally:
+            self._semaphore.release()
+
+        self.breaker.record_success()
+        return content
+
+    def stream_chat_completion(self, messages, model='gpt-4', max_tokens=500, temperature=0.7, timeout=None):
+        """Yield completion tokens as the upstream produces them"""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        self._acquire(deadline)
+        response = None
+        try:
+            response = self._post({
+                'model': model,
+                'messages': messages,
+                'max_tokens': max_tokens,
+                'temperature': temperature,
+                'stream': True
+            }, deadline, stream=True)
+
+            for line in response.iter_lines(decode_unicode=True):
+                if time.monotonic() > deadline:
+                    raise UpstreamUnavailableError('Deadline exceeded while streaming')
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                token = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                if token:
+                    yield token
+        except GeneratorExit:
+            # The consumer went away; that says nothing about upstream health
+            self.breaker.release_trial()
+            raise
+        except Exception as e:
+            self._record_error(e)
+            if isinstance(e, LLMGatewayError):
+                raise
+            raise LLMGatewayError(str(e)) from e
+        else:
+            self.breaker.record_success()
+        finally:
+            if response is not None:
+                response.close()
+            self._semaphore.release()
+
+    def stats(self):
+        """Report gateway counters and circuit state"""
+        with self._stats_lock:
+            counters = dict(self.counters)
+        counters.update(self.breaker.stats())
+        counters['max_concurrency'] = self.max_concurrency
+        counters['queue_timeout'] = self.queue_timeout
+        return counters
+
+_default_gateway = None
+_default_gateway_lock = threading.Lock()
+
+def get_llm_gateway():
+    """Return the process-wide gateway configured from the environment"""
+    global _default_gateway
+    with _default_gateway_lock:
+        if _default_gateway is None:
+            _default_gateway = LLMGateway(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                api_base=os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1'),
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 8)),
+                timeout=float(os.getenv('LLM_TIMEOUT_SECONDS', 30)),
+                failure_threshold=int(os.getenv('LLM_BREAKER_FAILURES', 5)),
+                reset_timeout=float(os.getenv('LLM_BREAKER_RESET_SECONDS', 30)),
+                queue_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', 0.5))
+            )
+        return _default_gateway
@@ -0,0 +1,91 @@
+import math
+import sys
+import threading
+
+# OpenAI's rule of thumb for English text; close enough to budget against
+# without shipping a tokenizer
+CHARS_PER_TOKEN = 4
+
+def compact_prompt(text):
+    """Drop the indentation, trailing spaces and blank lines that only cost tokens"""
+    return '\n'.join(line.strip() for line in (text or '').splitlines() if line.strip())
+
+def estimate_tokens(text):
+    """Approximate token count for text"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+class PromptSection:
+    """A titled block of prompt lines.
+
+    Sections with a lower ``priority`` are trimmed first, one line at a time,
+    until the prompt fits its budget; ``keep`` lines are never trimmed.
+    ``oldest_first`` trims from the top (e.g. history) rather than the bottom
+    (e.g. the least relevant framework references). ``priority=None`` marks a
+    section that is always sent whole.
+    """
+
+    def __init__(self, title, lines, priority=None, keep=0, oldest_first=False):
+        self.title = title
+        self.lines = [compact_prompt(line) for line in lines if line and line.strip()]
+        self.priority = priority
+        self.keep = keep
+        self.oldest_first = oldest_first
+
+    def render(self):
+        if not self.lines:
+            return ''
+        if self.title:
+            return '\n'.join([self.title] + self.lines)
+        return '\n'.join(self.lines)
+
+class PromptBuilder:
+    """Assemble prompts against a per-request token budget.
+
+    The system prompt is compacted and interned once, and its token estimate
+    kept, so each request only builds and measures its own user prompt. The
+    budget covers both messages; whatever the system prompt leaves is filled
+    with the request's sections, trimming the lowest-priority lines first.
+    """
+
+    def __init__(self, system_prompt, token_budget=2400):
+        self.system_prompt = sys.intern(compact_prompt(system_prompt))
+        self.system_tokens = estimate_tokens(self.system_prompt)
+        self.token_budget = token_budget
+        self._lock = threading.Lock()
+        self.counters = {'prompts': 0, 'prompt_tokens': 0, 'trimmed_lines': 0, 'over_budget': 0}
+
+    def build(self, sections):
+        """Render sections into a user prompt that fits the budget; return (prompt, estimated tokens)"""
+        sections = [section for section in sections if section.lines]
+        budget = self.token_budget - self.system_tokens
+        # Sections are joined by newlines, so each line costs its length plus one
+        size = sum(len(section.render()) + 1 for section in sections) - 1 if sections else 0
+
+        trimmed = 0
+        trimmable = sorted((s for s in sections if s.priority is not None), key=lambda s: s.priority)
+        for section in trimmable:
+            while math.ceil(size / CHARS_PER_TOKEN) > budget and len(section.lines) > section.keep:
+                line = section.lines.pop(0 if section.oldest_first else -1)
+                size -= len(line) + 1
+                if not section.lines and section.title:
+                    size -= len(section.title) + 1
+                trimmed += 1
+
+        prompt = '\n'.join(section.render() for section in sections if section.lines)
+        tokens = estimate_tokens(prompt)
+        with self._lock:
+            self.counters['prompts'] += 1
+            self.counters['prompt_tokens'] += tokens + self.system_tokens
+            self.counters['trimmed_lines'] += trimmed
+            if tokens > budget:
+                self.counters['over_budget'] += 1
+        return prompt, tokens
+
+    def stats(self):
+        """Report prompt counts, token totals and how much was trimmed"""
+        with self._lock:
+            stats = dict(self.counters)
+        stats['system_tokens'] = self.system_tokens
+        stats['token_budget'] = self.token_budget
+        stats['avg_prompt_tokens'] = stats['prompt_tokens'] / stats['prompts'] if stats['prompts'] else 0.0
+        return stats
@@ -0,0 +1,140 @@
+import os
+import math
+import time
+import sqlite3
+import threading
+
+class InProcessRateLimitBackend:
+    """Rate limit counters held in this process, guarded by a lock"""
+
+    def __init__(self, prune_every=1000):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._prune_every = prune_every
+        self._updates = 0
+
+    def update(self, key, apply, current_window):
+        """Atomically replace the counter for key with apply(counter)"""
+        with self._lock:
+            state, result = apply(self._counters.get(key))
+            self._counters[key] = state
+
+            # Keys that haven't been seen for two windows carry no information
+            self._updates += 1
+            if self._updates % self._prune_every == 0:
+                for stale in [k for k, (window, _, _) in self._counters.items() if window < current_window - 1]:
+                    del self._counters[stale]
+            return result
+
+    def __len__(self):
+        return len(self._counters)
+
+class SQLiteRateLimitBackend:
+    """Rate limit counters in a SQLite file shared by every worker process"""
+
+    def __init__(self, db_path, prune_every=1000):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._prune_every = prune_every
+        self._updates = 0
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit '
+            '(key TEXT PRIMARY KEY, window_index INTEGER NOT NULL, previous INTEGER NOT NULL, current INTEGER NOT NULL)'
+        )
+
+    def _connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def update(self, key, apply, current_window):
+        db = self._connection()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute('SELECT window_index, previous, current FROM rate_limit WHERE key = ?', (key,)).fetchone()
+            state, result = apply(tuple(row) if row else None)
+            db.execute(
+                'INSERT OR REPLACE INTO rate_limit (key, window_index, previous, current) VALUES (?, ?, ?, ?)',
+                (key,) + tuple(state)
+            )
+            self._updates += 1
+            if self._updates % self._prune_every == 0:
+                db.execute('DELETE FROM rate_limit WHERE window_index < ?', (current_window - 1,))
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+        return result
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM rate_limit').fetchone()[0]
+
+class SlidingWindowRateLimiter:
+    """Sliding-window-counter rate limiter.
+
+    Each key keeps three integers: the current fixed window, and the request
+    counts of that window and the one before it. The request rate over the
+    trailing window is estimated by weighting the previous count by how much of
+    it still overlaps, so every check is O(1) in time and memory. Denied
+    requests get a ``retry_after`` computed from the counter state.
+    """
+
+    def __init__(self, max_requests=30, window_seconds=300, backend=None):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        # Backends define __len__, so an empty one is falsy
+        self.backend = backend if backend is not None else InProcessRateLimitBackend()
+
+    def check(self, key, now=None, cost=1):
+        """Record cost requests for key; return (allowed, retry_after_seconds)"""
+        now = time.time() if now is None else now
+        window = int(now // self.window_seconds)
+        elapsed = now - window * self.window_seconds
+
+        def apply(state):
+            if state is None or state[0] < window - 1:
+                previous, current = 0, 0
+            elif state[0] == window - 1:
+                previous, current = state[2], 0
+            else:
+                previous, current = state[1], state[2]
+
+            if self._estimate(previous, current, elapsed) + cost > self.max_requests:
+                return (window, previous, current), (False, self._retry_after(previous, current, elapsed, cost))
+            return (window, previous, current + cost), (True, 0)
+
+        return self.backend.update(key, apply, window)
+
+    def _estimate(self, previous, current, elapsed):
+        return previous * (1 - elapsed / self.window_seconds) + current
+
+    def _retry_after(self, previous, current, elapsed, cost=1):
+        """Seconds until cost more requests would fit under the limit"""
+        window = self.window_seconds
+        room = self.max_requests - cost
+        if room < 0:
+            # More than a whole window's allowance can never be granted at once
+            return window
+        if current <= room and previous > 0:
+            # The previous window's weight decays enough within this window
+            wait = window * (1 - (room - current) / previous) - elapsed
+        else:
+            # Wait for the next window, where this window's count becomes the decaying one
+            wait = (window - elapsed) + (window * (1 - room / current) if current else 0)
+        return max(1, math.ceil(wait))
+
+    def __len__(self):
+        return len(self.backend)
+
+def create_rate_limiter(max_requests=30, window_seconds=300):
+    """Build a rate limiter using the backend selected by RATE_LIMIT_BACKEND"""
+    if os.getenv('RATE_LIMIT_BACKEND', 'memory').lower() == 'sqlite':
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'rate_limit.db')
+        backend = SQLiteRateLimitBackend(os.getenv('RATE_LIMIT_DB_PATH', default_path))
+    else:
+        backend = InProcessRateLimitBackend()
+    return SlidingWindowRateLimiter(max_requests, window_seconds, backend)
@@ -0,0 +1,149 @@
+import copy
+from functools import lru_cache
+from reportlab.platypus import Paragraph, Spacer, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+
+# Built once at import; ParagraphStyle objects are read-only during a render
+BASE_STYLES = getSampleStyleSheet()
+
+# Styles for the personalized course design report served by main.py
+DESIGN_REPORT_STYLES = {
+    'title': ParagraphStyle(
+        'CustomTitle',
+        parent=BASE_STYLES['Title'],
+        fontSize=24,
+        textColor=colors.HexColor('#2E86AB'),
+        spaceAfter=30,
+        alignment=1  # Center
+    ),
+    'heading': ParagraphStyle(
+        'CustomHeading',
+        parent=BASE_STYLES['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#A23B72'),
+        spaceBefore=20,
+        spaceAfter=10
+    ),
+    'body': ParagraphStyle(
+        'CustomBody',
+        parent=BASE_STYLES['Normal'],
+        fontSize=12,
+        spaceAfter=12,
+        leftIndent=20
+    )
+}
+
+# Styles for the conversation export served by routes/export.py
+EXPORT_STYLES = {
+    'title': ParagraphStyle(
+        'CustomTitle',
+        parent=BASE_STYLES['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=colors.HexColor('#2563eb')
+    ),
+    'heading': BASE_STYLES['Heading2'],
+    'normal': BASE_STYLES['Normal'],
+    'user_message': ParagraphStyle(
+        'UserMessage',
+        parent=BASE_STYLES['Normal'],
+        leftIndent=20,
+        textColor=colors.HexColor('#1e40af'),
+        fontName='Helvetica-Bold'
+    ),
+    'assistant_message': ParagraphStyle(
+        'AssistantMessage',
+        parent=BASE_STYLES['Normal'],
+        leftIndent=20,
+        textColor=colors.HexColor('#059669')
+    ),
+    'footer': ParagraphStyle(
+        'Footer',
+        parent=BASE_STYLES['Normal'],
+        fontSize=10,
+        textColor=colors.grey,
+        alignment=1  # Center alignment
+    )
+}
+
+PROGRESS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f1f5f9')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+FRAMEWORK_POINTS = [
+    "✅ <b>Learner-Centered Design:</b> You've clearly identified your audience and their unique needs",
+    "✅ <b>Practical AI Applications:</b> Your tool selection directly addresses real-world applications",
+    "✅ <b>Inclusive & Equitable:</b> Your approach welcomes diverse learners and addresses bias",
+    "✅ <b>Ethics-First:</b> You've considered responsible AI use throughout your design",
+    "✅ <b>Future-Ready Skills:</b> Your course prepares learners for evolving AI landscape",
+    "✅ <b>Authentic Assessment:</b> Your evaluation methods are practical and meaningful"
+]
+
+ROADMAP_PHASES = [
+    "<b>Phase 1:</b> Finalize curriculum details and learning materials",
+    "<b>Phase 2:</b> Develop hands-on exercises and assessment rubrics",
+    "<b>Phase 3:</b> Create inclusive learning environment and bias-checking protocols",
+    "<b>Phase 4:</b> Launch pilot program with feedback collection",
+    "<b>Phase 5:</b> Iterate and scale based on learner outcomes"
+]
+
+def _section(heading, style, *flowables):
+    return (Paragraph(heading, style),) + flowables
+
+def _build_design_report_sections():
+    heading = DESIGN_REPORT_STYLES['heading']
+    body = DESIGN_REPORT_STYLES['body']
+    return {
+        'title': (Paragraph("🎉 Your She Is AI Course Design", DESIGN_REPORT_STYLES['title']), Spacer(1, 20)),
+        'overview': _section("📋 Your Course Overview", heading),
+        'framework': _section(
+            "🌟 She Is AI Framework Alignment", heading,
+            *[Paragraph(point, body) for point in FRAMEWORK_POINTS], Spacer(1, 20)
+        ),
+        'success': _section("🚀 Why Your Course Will Transform Lives", heading),
+        'roadmap': _section(
+            "📈 Your Implementation Roadmap", heading,
+            *[Paragraph(phase, body) for phase in ROADMAP_PHASES], Spacer(1, 30)
+        ),
+        'closing': _section("💪 You're Ready to Make an Impact", heading)
+    }
+
+def _build_export_sections():
+    heading = EXPORT_STYLES['heading']
+    return {
+        'title': (Paragraph("She Is AI Course Design Summary", EXPORT_STYLES['title']), Spacer(1, 20)),
+        'progress': _section("<b>Course Design Progress</b>", heading, Spacer(1, 10)),
+        'objectives': _section("<b>Learning Objectives</b>", heading, Spacer(1, 10)),
+        'assessment': _section("<b>Assessment Approach</b>", heading, Spacer(1, 10)),
+        'conversation': _section("<b>Design Conversation</b>", heading, Spacer(1, 10)),
+        'coverage': (Spacer(1, 20),) + _section("<b>Framework Coverage Analysis</b>", heading, Spacer(1, 10))
+    }
+
+DESIGN_REPORT_SECTIONS = _build_design_report_sections()
+EXPORT_SECTIONS = _build_export_sections()
+
+def static_flowables(sections, name):
+    """Return fresh copies of a prebuilt section's flowables.
+
+    Parsing a Paragraph's markup is the expensive part and happens once at
+    import; each render gets shallow copies so concurrent builds never share
+    the per-render layout state that ``wrap`` stores on a flowable.
+    """
+    return [copy.copy(flowable) for flowable in sections[name]]
+
+@lru_cache(maxsize=64)
+def _coverage_paragraph(area, covered):
+    status_text = "✓ Covered" if covered else "○ Not Covered"
+    return Paragraph(f"<b>{area}:</b> {status_text}", EXPORT_STYLES['normal'])
+
+def coverage_flowable(area, covered):
+    """Return the framework coverage line for an area; there are only a handful of distinct ones"""
+    return copy.copy(_coverage_paragraph(area, bool(covered)))
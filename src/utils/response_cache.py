@@ -0,0 +1,143 @@
+import os
+import re
+import time
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+_NON_WORD = re.compile(r'[^\w\s]')
+
+def normalize_text(text):
+    """Lowercase, drop punctuation and collapse whitespace so near-identical messages share a key"""
+    return ' '.join(_NON_WORD.sub(' ', (text or '').lower()).split())
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache for LLM completions.
+
+    Entries live in an in-process ``OrderedDict``; when ``db_path`` is given they
+    are also written through to a SQLite table so other workers and restarts can
+    reuse them. Memory hits never touch SQLite.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'disk_hits': 0, 'evictions': 0}
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+
+    def make_key(self, user_message, topic, educational_level, areas_covered):
+        """Build a cache key from the normalized inputs that shape the prompt"""
+        payload = json.dumps([
+            normalize_text(user_message),
+            topic or '',
+            normalize_text(educational_level),
+            sorted(normalize_text(area) for area in (areas_covered or []))
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is None:
+                self.counters['misses'] += 1
+                return None
+
+        # Disk lookups run outside the memory lock so they never stall memory hits
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT value, created_at FROM response_cache WHERE key = ?', (key,)
+            ).fetchone()
+
+        with self._lock:
+            if row and now - row[1] < self.ttl_seconds:
+                self._store(key, row[0], row[1])
+                self.counters['hits'] += 1
+                self.counters['disk_hits'] += 1
+                return row[0]
+            self.counters['misses'] += 1
+            return None
+
+    def set(self, key, value):
+        """Cache value under key"""
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO response_cache (key, value, created_at) VALUES (?, ?, ?)',
+                    (key, value, now)
+                )
+
+    def _store(self, key, value, created_at):
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def purge_expired(self):
+        """Drop expired entries from memory and disk"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for key in [k for k, (_, created_at) in self._entries.items() if created_at <= cutoff]:
+                del self._entries[key]
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM response_cache WHERE created_at <= ?', (cutoff,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM response_cache')
+
+    def stats(self):
+        """Report hit/miss counters and occupancy"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """Return the process-wide response cache configured from the environment"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(
+                max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', 1024)),
+                ttl_seconds=float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', 3600)),
+                db_path=os.getenv('RESPONSE_CACHE_DB') or None
+            )
+        return _default_cache
@@ -0,0 +1,82 @@
+import re
+
+# Patterns stripped from user input, applied in order. Each removal can join the
+# text around it into a new match for a later pattern, so these stay sequential.
+STRIP_PATTERNS = [
+    re.compile(r'<[^>]+>'),
+    re.compile(r'javascript:', re.IGNORECASE),
+    re.compile(r'<script.*?</script>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'[<>"\']'),
+    re.compile(r'(eval|exec|import|__)', re.IGNORECASE),
+    re.compile(r'(union|select|insert|delete|drop|create|alter)', re.IGNORECASE)
+]
+
+# Privacy redactions as (label, pattern, replacement), applied in order
+REDACTION_PATTERNS = [
+    ('url', r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '[URL_REMOVED]'),
+    ('email', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL_REMOVED]'),
+    ('phone', r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE_REMOVED]'),
+    ('card', r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', '[CARD_REMOVED]'),
+    ('ssn', r'\b\d{3}[-]?\d{2}[-]?\d{4}\b', '[SSN_REMOVED]')
+]
+
+class InputSanitizer:
+    """Compiled sanitization pipeline for user messages.
+
+    Both the strip patterns and the privacy redactions are compiled once and run
+    in sequence. The redactions stay separate passes on purpose: fused into one
+    alternation, the leftmost match wins, so a URL would swallow the phone number
+    running straight into it and an SSN could take the digits of a phone number
+    that starts later. ``sanitize`` returns the cleaned text together
+    with the labels of the redactions that fired, so callers can reuse them
+    instead of re-running the same regexes on the raw message. A URL swallows
+    anything inside it, so each redacted URL is also scanned for the other
+    categories, e.g. an email in a query string still reports ``email``.
+    """
+
+    def __init__(self, max_length=2000):
+        self.max_length = max_length
+        self.strip_patterns = STRIP_PATTERNS
+        self.replacements = {label: replacement for label, _, replacement in REDACTION_PATTERNS}
+        self.redaction_patterns = [(label, re.compile(pattern)) for label, pattern, _ in REDACTION_PATTERNS]
+        self.url_contents_patterns = [
+            (label, re.compile(pattern)) for label, pattern, _ in REDACTION_PATTERNS if label != 'url'
+        ]
+
+    def sanitize(self, user_input):
+        """Return (clean_text, redactions) for a raw user message.
+
+        Unsafe patterns are stripped, private data redacted, then the text is
+        trimmed and its whitespace collapsed.
+        """
+        if not user_input or not isinstance(user_input, str):
+            return "", ()
+
+        for pattern in self.strip_patterns:
+            user_input = pattern.sub('', user_input)
+
+        fired = []
+
+        def record(labels):
+            for found in labels:
+                if found not in fired:
+                    fired.append(found)
+
+        def redactor(label):
+            def redact(match):
+                labels = [label]
+                if label == 'url':
+                    labels.extend(inner for inner, pattern in self.url_contents_patterns if pattern.search(match.group()))
+                record(labels)
+                return self.replacements[label]
+            return redact
+
+        for label, pattern in self.redaction_patterns:
+            user_input = pattern.sub(redactor(label), user_input)
+
+        # Limit length for security
+        if len(user_input) > self.max_length:
+            user_input = user_input[:self.max_length]
+
+        # Remove excessive whitespace
+        return ' '.join(user_input.split()), tuple(fired)
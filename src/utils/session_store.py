@@ -0,0 +1,415 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Session fields held as sets in memory and as sorted lists when stored
+SET_FIELDS = ('areas_covered',)
+
+def _encode(value):
+    if isinstance(value, set):
+        return sorted(value)
+    raise TypeError(f'{type(value).__name__} is not serializable')
+
+def _restore_sets(data):
+    for field in SET_FIELDS:
+        if isinstance(data.get(field), list):
+            data[field] = set(data[field])
+    return data
+
+def serialize_state(conversation):
+    """Serialize a session without its messages or private bookkeeping keys"""
+    state = {
+        key: value for key, value in conversation.items()
+        if key != 'messages' and not key.startswith('_')
+    }
+    return json.dumps(state, separators=(',', ':'), default=_encode)
+
+def deserialize_state(payload):
+    """Rebuild a session dict (minus messages) from its stored form"""
+    state = _restore_sets(json.loads(payload))
+    if isinstance(state.get('course_info'), dict):
+        _restore_sets(state['course_info'])
+    return state
+
+def serialize_message(message):
+    return json.dumps(message, separators=(',', ':'))
+
+class SessionStore:
+    """Base session store with write-behind batching.
+
+    Session state (everything except messages) is stored as one compact JSON
+    blob, and messages are appended to a separate log so a turn never rewrites
+    the whole history. ``save`` only queues the changes, skipping a state that
+    is unchanged since it was loaded or last saved; ``flush`` writes every
+    queued state and message in one batch. Reads see queued writes, so a worker
+    always reads its own changes.
+
+    Loaded sessions carry only the most recent ``history_window`` messages, which
+    is all the conversation flow needs once course information is tracked
+    incrementally. Backends implement ``_write_batch``, ``_read_state``,
+    ``_read_messages``, ``_delete`` and ``_count``.
+    """
+
+    def __init__(self, history_window=20, flush_threshold=100):
+        self.history_window = history_window
+        self.flush_threshold = flush_threshold
+        self._pending_states = {}
+        self._pending_messages = []
+        self._lock = threading.RLock()
+
+    def get(self, session_id):
+        """Load a session dict, or return None if it doesn't exist"""
+        # Both tiers are read under the lock flush() holds while it writes, so a
+        # flush can't move queued messages into storage between the two reads
+        with self._lock:
+            payload = self._pending_states.get(session_id)
+            pending = [body for sid, body in self._pending_messages if sid == session_id]
+            if payload is None:
+                payload = self._read_state(session_id)
+                if payload is None:
+                    return None
+            stored = self._read_messages(session_id, self.history_window)
+
+        conversation = deserialize_state(payload)
+        messages = [json.loads(body) for body in stored + pending][-self.history_window:]
+        conversation['messages'] = messages
+        conversation['_stored_message_count'] = len(messages)
+        conversation['_stored_state'] = hash(payload)
+        return conversation
+
+    def save(self, session_id, conversation):
+        """Queue the session state if it changed, and any messages added since it was loaded"""
+        messages = conversation.get('messages', [])
+        new_messages = messages[conversation.get('_stored_message_count', 0):]
+        conversation['_stored_message_count'] = len(messages)
+
+        state = serialize_state(conversation)
+        state_changed = hash(state) != conversation.get('_stored_state')
+        conversation['_stored_state'] = hash(state)
+        if not state_changed and not new_messages:
+            return
+
+        with self._lock:
+            if state_changed:
+                self._pending_states[session_id] = state
+            self._pending_messages.extend((session_id, serialize_message(msg)) for msg in new_messages)
+            should_flush = len(self._pending_messages) >= self.flush_threshold
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Write all queued states and messages in a single batch"""
+        with self._lock:
+            if not self._pending_states and not self._pending_messages:
+                return
+            states, self._pending_states = self._pending_states, {}
+            messages, self._pending_messages = self._pending_messages, []
+            self._write_batch(states, messages)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._pending_states.pop(session_id, None)
+            self._pending_messages = [item for item in self._pending_messages if item[0] != session_id]
+            self._delete(session_id)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            if session_id in self._pending_states:
+                return True
+        return self._read_state(session_id) is not None
+
+    def __getitem__(self, session_id):
+        conversation = self.get(session_id)
+        if conversation is None:
+            raise KeyError(session_id)
+        return conversation
+
+    def __setitem__(self, session_id, conversation):
+        self.save(session_id, conversation)
+
+    def __len__(self):
+        self.flush()
+        return self._count()
+
+    def stats(self):
+        """Report store occupancy for health checks"""
+        self.flush()
+        return {'backend': type(self).__name__, 'sessions': self._count()}
+
+class InMemorySessionStore(SessionStore):
+    """Process-local backend, for development and single-worker deployments.
+
+    The store is bounded: sessions idle for longer than ``idle_ttl`` seconds are
+    evicted by a background sweeper, and the least recently used sessions are
+    evicted whenever ``max_entries`` or ``max_bytes`` is exceeded. With a
+    ``spill_store`` evicted sessions are written there instead of dropped, and
+    are restored transparently when the user comes back.
+    """
+
+    def __init__(self, idle_ttl=6 * 3600, max_entries=10000, max_bytes=256 * 1024 * 1024,
+                 spill_store=None, sweep_interval=60, **kwargs):
+        super().__init__(**kwargs)
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_store = spill_store
+        self.sweep_interval = sweep_interval
+        self._states = OrderedDict()
+        self._messages = {}
+        self._sizes = {}
+        self._message_bytes = {}
+        self._last_access = {}
+        self._bytes = 0
+        self._sweeper = None
+        self.counters = {'idle_evictions': 0, 'capacity_evictions': 0, 'spilled': 0, 'restored': 0}
+
+    def _touch(self, session_id):
+        self._states.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+
+    def _resize(self, session_id, added_bytes=0):
+        """Update a session's tracked size from its state and newly appended messages"""
+        message_bytes = self._message_bytes.get(session_id, 0) + added_bytes
+        self._message_bytes[session_id] = message_bytes
+        size = len(self._states[session_id]) + message_bytes
+        self._bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+
+    def _write_batch(self, states, messages):
+        with self._lock:
+            self._states.update(states)
+            added = {}
+            for session_id, body in messages:
+                self._messages.setdefault(session_id, []).append(body)
+                added[session_id] = added.get(session_id, 0) + len(body)
+            # Sessions with only new messages have an unchanged state but grow all the same
+            for session_id in set(states) | set(added):
+                if session_id in self._states:
+                    self._touch(session_id)
+                    self._resize(session_id, added.get(session_id, 0))
+            self._enforce_limits()
+        self._start_sweeper()
+
+    def _read_state(self, session_id):
+        with self._lock:
+            if session_id not in self._states and not self._restore(session_id):
+                return None
+            self._touch(session_id)
+            return self._states[session_id]
+
+    def _read_messages(self, session_id, limit):
+        with self._lock:
+            return list(self._messages.get(session_id, [])[-limit:])
+
+    def _delete(self, session_id):
+        with self._lock:
+            self._drop(session_id)
+        if self.spill_store is not None:
+            self.spill_store.delete(session_id)
+
+    def _count(self):
+        return len(self._states)
+
+    def _drop(self, session_id):
+        """Remove a session from memory and return its state and messages"""
+        state = self._states.pop(session_id, None)
+        messages = self._messages.pop(session_id, [])
+        self._bytes -= self._sizes.pop(session_id, 0)
+        self._message_bytes.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        return state, messages
+
+    def _evict(self, session_id, reason):
+        state, messages = self._drop(session_id)
+        self.counters[reason] += 1
+        if self.spill_store is not None and state is not None:
+            self.spill_store.spill(session_id, state, messages)
+            self.counters['spilled'] += 1
+
+    def _restore(self, session_id):
+        """Bring a spilled session back into memory"""
+        if self.spill_store is None:
+            return False
+        restored = self.spill_store.take(session_id)
+        if restored is None:
+            return False
+        state, messages = restored
+        self._states[session_id] = state
+        self._messages[session_id] = messages
+        self._touch(session_id)
+        self._resize(session_id, sum(len(body) for body in messages))
+        self.counters['restored'] += 1
+        self._enforce_limits(keep=session_id)
+        return True
+
+    def _enforce_limits(self, keep=None):
+        """Evict least recently used sessions until the store fits its caps"""
+        while len(self._states) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._states))
+            if oldest == keep:
+                break
+            self._evict(oldest, 'capacity_evictions')
+
+    def sweep(self):
+        """Evict every session that has been idle for longer than idle_ttl"""
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            # Sessions are kept in access order, so idle ones are at the front
+            while self._states:
+                oldest = next(iter(self._states))
+                if self._last_access.get(oldest, 0) > cutoff:
+                    break
+                self._evict(oldest, 'idle_evictions')
+
+    def _start_sweeper(self):
+        """Start the background sweeper on first write (after any worker fork)"""
+        if self._sweeper is not None or not self.sweep_interval:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name='session-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Session sweep failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'backend': type(self).__name__,
+                'sessions': len(self._states),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'idle_ttl_seconds': self.idle_ttl,
+                'spill_enabled': self.spill_store is not None
+            }
+            stats.update(self.counters)
+        return stats
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite backend in WAL mode, shared by every worker process on the host"""
+
+    def __init__(self, db_path, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self._local = threading.local()
+
+        db = self._connection()
+        db.executescript('''
+            CREATE TABLE IF NOT EXISTS session_state (
+                session_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_message (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                body TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_session_message_session ON session_message (session_id, id);
+        ''')
+
+    def _connection(self):
+        """Return this thread's connection, opening it on first use"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('PRAGMA busy_timeout=30000')
+            self._local.db = db
+        return db
+
+    def _write_batch(self, states, messages):
+        db = self._connection()
+        now = time.time()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.executemany(
+                'INSERT INTO session_state (session_id, state, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at',
+                [(session_id, state, now) for session_id, state in states.items()]
+            )
+            db.executemany('INSERT INTO session_message (session_id, body) VALUES (?, ?)', messages)
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+
+    def _read_state(self, session_id):
+        row = self._connection().execute(
+            'SELECT state FROM session_state WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _read_messages(self, session_id, limit):
+        rows = self._connection().execute(
+            'SELECT body FROM session_message WHERE session_id = ? ORDER BY id DESC LIMIT ?',
+            (session_id, limit)
+        ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def _delete(self, session_id):
+        db = self._connection()
+        db.execute('BEGIN IMMEDIATE')
+        db.execute('DELETE FROM session_message WHERE session_id = ?', (session_id,))
+        db.execute('DELETE FROM session_state WHERE session_id = ?', (session_id,))
+        db.execute('COMMIT')
+
+    def _count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM session_state').fetchone()[0]
+
+    def spill(self, session_id, state, messages):
+        """Store a session evicted from memory, replacing any earlier copy"""
+        db = self._connection()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.execute('DELETE FROM session_message WHERE session_id = ?', (session_id,))
+            db.execute(
+                'INSERT OR REPLACE INTO session_state (session_id, state, updated_at) VALUES (?, ?, ?)',
+                (session_id, state, time.time())
+            )
+            db.executemany(
+                'INSERT INTO session_message (session_id, body) VALUES (?, ?)',
+                [(session_id, body) for body in messages]
+            )
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+
+    def take(self, session_id):
+        """Remove a spilled session and return (state, messages), or None"""
+        state = self._read_state(session_id)
+        if state is None:
+            return None
+        messages = self._read_messages(session_id, -1)
+        self._delete(session_id)
+        return state, messages
+
+def create_session_store():
+    """Build the session store selected by the SESSION_STORE environment variable"""
+    backend = os.getenv('SESSION_STORE', 'memory').lower()
+    if backend == 'sqlite':
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'sessions.db')
+        return SQLiteSessionStore(os.getenv('SESSION_DB_PATH', default_path))
+    
+    spill_path = os.getenv('SESSION_SPILL_PATH')
+    return InMemorySessionStore(
+        idle_ttl=float(os.getenv('SESSION_IDLE_TTL_SECONDS', 6 * 3600)),
+        max_entries=int(os.getenv('SESSION_MAX_ENTRIES', 10000)),
+        max_bytes=int(os.getenv('SESSION_MAX_BYTES', 256 * 1024 * 1024)),
+        spill_store=SQLiteSessionStore(spill_path) if spill_path else None,
+        sweep_interval=float(os.getenv('SESSION_SWEEP_INTERVAL_SECONDS', 60))
+    )
@@ -0,0 +1,15 @@
+import pytest
+
+from src.app import create_app
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}"
+    })
+    yield app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,28 @@
+from src import main
+
+def test_repeated_messages_do_not_grow_the_course_information():
+    info = main.new_course_information()
+    text = 'I want a practical, hands-on course with a quiz for professionals who use canva every day'
+    for _ in range(50):
+        main.update_course_information(info, text)
+
+    assert info['learning_goals'] == ['practical application']
+    assert info['assessment_methods'] == ['interactive assessment']
+    assert info['ai_tools'] == ['canva']
+    assert len(info['unique_aspects']) == 1
+    assert info['user_responses'] == 50
+
+def test_unique_aspects_are_capped():
+    info = main.new_course_information()
+    for i in range(main.MAX_UNIQUE_ASPECTS + 5):
+        main.update_course_information(info, f'answer number {i} with enough detail to count as a substantial response')
+
+    assert len(info['unique_aspects']) == main.MAX_UNIQUE_ASPECTS
+    assert info['unique_aspects'][-1].startswith(f'answer number {main.MAX_UNIQUE_ASPECTS + 4} ')
+
+def test_incremental_state_matches_a_full_rescan():
+    conversation = {'messages': [], 'areas_covered': set(), 'course_info': main.new_course_information()}
+    for text in ['We teach students', 'basic chatgpt and gemini skills', 'with a final assessment']:
+        main.add_user_message(conversation, text)
+
+    assert conversation['course_info'] == main.extract_course_information(conversation['messages'])
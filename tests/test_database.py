@@ -0,0 +1,65 @@
+import shutil
+import sqlite3
+
+from src.app import create_app
+from src.database import engine
+from src.database.migrations import DEFAULT_DB_PATH, MIGRATIONS, migrate
+
+def bundled_database_copy(tmp_path):
+    """A copy of the bundled app.db, which predates every migration"""
+    path = tmp_path / 'app.db'
+    shutil.copyfile(DEFAULT_DB_PATH, path)
+    return str(path)
+
+def columns(path, table):
+    with sqlite3.connect(path) as db:
+        return {row[1] for row in db.execute(f'PRAGMA table_info({table})')}
+
+def user_version(path):
+    with sqlite3.connect(path) as db:
+        return db.execute('PRAGMA user_version').fetchone()[0]
+
+def test_migrate_upgrades_the_bundled_database_once(tmp_path):
+    path = bundled_database_copy(tmp_path)
+    assert user_version(path) == 0
+
+    assert migrate(path) == [version for version, _, _ in MIGRATIONS]
+    assert user_version(path) == MIGRATIONS[-1][0]
+    assert {'message_count', 'user_message_count', 'insight_flags'} <= columns(path, 'conversation')
+    assert migrate(path) == []
+
+def test_migrate_stops_at_target(tmp_path):
+    path = bundled_database_copy(tmp_path)
+    assert migrate(path, target=2) == [1, 2]
+    assert 'message_count' in columns(path, 'conversation')
+    assert 'user_message_count' not in columns(path, 'conversation')
+
+def test_migrate_leaves_an_empty_database_alone(tmp_path):
+    path = str(tmp_path / 'empty.db')
+    sqlite3.connect(path).close()
+    assert migrate(path) == []
+    assert user_version(path) == 0
+
+def test_create_app_migrates_an_existing_database(tmp_path):
+    path = bundled_database_copy(tmp_path)
+    create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    assert user_version(path) == MIGRATIONS[-1][0]
+
+def test_health_reports_database_stats(client):
+    client.post('/api/conversations')
+    database = client.get('/api/health').get_json()['database']
+    assert {'lock_acquisitions', 'lock_errors', 'begin_immediate', 'pool'} <= set(database)
+
+def test_begin_immediate_times_write_lock_waits(tmp_path, monkeypatch):
+    monkeypatch.setenv('SQLITE_BEGIN_IMMEDIATE', '1')
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}"})
+    before = engine.lock_wait_stats.stats()['lock_acquisitions']
+
+    response = app.test_client().post('/api/conversations')
+    assert response.status_code == 200
+    assert engine.lock_wait_stats.stats()['lock_acquisitions'] > before
+
+def test_sqlite_connections_use_wal(app):
+    with app.app_context():
+        mode = engine.db.session.execute(engine.db.text('PRAGMA journal_mode')).scalar()
+    assert mode == 'wal'
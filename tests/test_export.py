@@ -0,0 +1,113 @@
+import io
+import os
+
+import pytest
+
+from src.utils.export_cache import ExportCache, export_cache_key
+
+class ServerFileWrapper:
+    """A server's own wsgi.file_wrapper, as gunicorn or uWSGI would provide"""
+
+    def __init__(self, filelike, block_size=8192):
+        self.filelike = filelike
+        self.block_size = block_size
+        self.closed = False
+
+    def __iter__(self):
+        while True:
+            chunk = self.filelike.read(self.block_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        self.closed = True
+        self.filelike.close()
+
+@pytest.fixture
+def session_id(client):
+    session_id = client.post('/api/conversations').get_json()['session_id']
+    client.post(f'/api/conversations/{session_id}/messages', json={'message': 'A beginner machine learning course'})
+    return session_id
+
+@pytest.mark.parametrize('format_type, mimetype, attachment', [
+    ('json', 'application/json', False),
+    ('csv', 'text/csv', True),
+    ('pdf', 'application/pdf', True),
+])
+def test_export_streams_through_the_server_file_wrapper(client, session_id, format_type, mimetype, attachment):
+    url = f'/api/conversations/{session_id}/export?format={format_type}'
+    for _ in range(2):
+        # The second request is served from the cache
+        response = client.get(url, environ_base={'wsgi.file_wrapper': ServerFileWrapper})
+        assert response.status_code == 200
+        assert response.mimetype == mimetype
+        assert response.headers.get('Content-Disposition', '').startswith('attachment') == attachment
+        assert response.get_data()
+        assert response.headers['ETag']
+
+def test_json_export_matches_jsonify(client, session_id):
+    data = client.get(f'/api/conversations/{session_id}/export?format=json').get_json()
+    assert data['conversation_metadata']['session_id'] == session_id
+
+def test_unchanged_export_revalidates_with_304(client, session_id):
+    url = f'/api/conversations/{session_id}/export?format=csv'
+    first = client.get(url)
+    etag = first.headers['ETag']
+
+    revalidated = client.get(url, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert revalidated.get_data() == b''
+
+    client.post(f'/api/conversations/{session_id}/messages', json={'message': 'Add a career module'})
+    changed = client.get(url, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+def test_unknown_format_is_rejected(client, session_id):
+    assert client.get(f'/api/conversations/{session_id}/export?format=xml').status_code == 400
+
+def test_cache_key_changes_with_its_inputs():
+    from datetime import datetime
+    updated = datetime(2024, 1, 1)
+    key = export_cache_key('s', 1, updated, 'csv')
+    assert key == export_cache_key('s', 1, updated, 'csv')
+    assert key != export_cache_key('s', 2, updated, 'csv')
+    assert key != export_cache_key('s', 1, updated, 'pdf')
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ExportCache(max_memory_bytes=10, max_entry_bytes=10)
+    cache.set('a', b'aaaa', {})
+    cache.set('b', b'bbbb', {})
+    cache.get('a')
+    cache.set('c', b'cccc', {})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == (b'aaaa', {})
+    assert cache.stats()['evictions'] == 1
+
+def test_disk_tier_is_private_and_survives_a_restart(tmp_path):
+    directory = str(tmp_path / 'exports')
+    ExportCache(disk_dir=directory).set('k', b'body', {'mimetype': 'text/csv'})
+
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    assert ExportCache(disk_dir=directory).get('k') == (b'body', {'mimetype': 'text/csv'})
+
+def test_large_entries_stay_on_disk_as_files(tmp_path):
+    cache = ExportCache(disk_dir=str(tmp_path), max_entry_bytes=4)
+    source = io.BytesIO(b'0123456789')
+    cache.set_file('k', source, {})
+    assert source.tell() == 0
+
+    body, _ = cache.get('k')
+    try:
+        assert body.read() == b'0123456789'
+    finally:
+        body.close()
+    assert cache.stats()['entries'] == 0
+
+def test_without_a_directory_nothing_touches_disk(tmp_path):
+    cache = ExportCache(max_entry_bytes=4)
+    cache.set_file('k', io.BytesIO(b'0123456789'), {})
+    assert cache.get('k') is None
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from src.utils.export_jobs import DiskJobStore, ExportJobQueue, ExportQueueFullError, InMemoryJobStore
+
+def render_text(text):
+    return text.encode('utf-8')
+
+def render_failure(message):
+    raise ValueError(message)
+
+def wait_for(queue, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job is not None and job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+@pytest.fixture(params=['memory', 'disk'])
+def store(request, tmp_path):
+    return InMemoryJobStore() if request.param == 'memory' else DiskJobStore(str(tmp_path / 'jobs'))
+
+def test_job_renders_on_the_pool(store):
+    queue = ExportJobQueue(max_workers=1, store=store)
+    job_id = queue.submit(render_text, ('hello',), mimetype='text/plain', download_name='hello.txt')
+
+    job = wait_for(queue, job_id)
+    assert job['status'] == 'done'
+    assert job['artifact'] == b'hello'
+    assert job['expires_at'] == job['finished_at'] + queue.artifact_ttl
+    assert queue.stats()['completed'] == 1
+
+def test_failed_job_reports_its_error(store):
+    queue = ExportJobQueue(max_workers=1, store=store)
+    job = wait_for(queue, queue.submit(render_failure, ('broken',), mimetype='text/plain', download_name='x'))
+    assert job['status'] == 'failed'
+    assert job['error'] == 'broken'
+
+def test_disk_store_is_shared_between_queues(tmp_path):
+    directory = str(tmp_path / 'jobs')
+    rendering = ExportJobQueue(max_workers=1, store=DiskJobStore(directory))
+    job_id = rendering.submit(render_text, ('shared',), mimetype='text/plain', download_name='x')
+    wait_for(rendering, job_id)
+
+    other_worker = ExportJobQueue(store=DiskJobStore(directory))
+    assert other_worker.get(job_id)['artifact'] == b'shared'
+
+def test_submit_beyond_max_pending_is_rejected():
+    queue = ExportJobQueue(max_workers=1, max_pending=0)
+    with pytest.raises(ExportQueueFullError):
+        queue.submit(render_text, ('x',), mimetype='text/plain', download_name='x')
+    assert queue.stats()['rejected'] == 1
+
+def test_expired_artifacts_are_purged_without_a_poll(store):
+    queue = ExportJobQueue(max_workers=1, artifact_ttl=0.2, purge_interval=0.05, store=store)
+    job_id = queue.submit(render_text, ('old',), mimetype='text/plain', download_name='x')
+    wait_for(queue, job_id)
+
+    deadline = time.monotonic() + 10
+    while store.load(job_id) is not None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert store.load(job_id) is None
+    assert store.load_artifact(job_id) is None
+    assert queue.stats()['expired'] == 1
+
+def test_stats_purges_expired_artifacts():
+    store = InMemoryJobStore()
+    queue = ExportJobQueue(artifact_ttl=60, purge_interval=0, store=store)
+    store.create({'job_id': 'old', 'status': 'done', 'finished_at': time.time() - 120})
+    store.create({'job_id': 'queued', 'status': 'queued', 'finished_at': None})
+
+    stats = queue.stats()
+    assert stats['jobs'] == 1
+    assert stats['expired'] == 1
+
+def test_job_ids_cannot_name_other_files(tmp_path):
+    store = DiskJobStore(str(tmp_path))
+    assert store.load('../../etc/passwd') is None
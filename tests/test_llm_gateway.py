@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from src.utils.llm_gateway import (
+    CircuitBreaker, CircuitOpenError, GatewayBusyError, LLMGateway, LLMGatewayError, UpstreamUnavailableError
+)
+
+class FakeResponse:
+    def __init__(self, status_code=200, content='hello'):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return {'choices': [{'message': {'content': self.content}}]}
+
+    def close(self):
+        pass
+
+def gateway_with(post, **kwargs):
+    gateway = LLMGateway(api_base='http://upstream.test', **kwargs)
+    gateway.session.post = post
+    return gateway
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens_after_reset():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert breaker.state == 'half_open'
+    # Only one trial goes through while it is in flight
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+def test_upstream_failures_trip_the_breaker_and_then_short_circuit():
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(kwargs)
+        return FakeResponse(503)
+
+    gateway = gateway_with(post, failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailableError):
+            gateway.chat_completion([{'role': 'user', 'content': 'hi'}])
+    with pytest.raises(CircuitOpenError):
+        gateway.chat_completion([{'role': 'user', 'content': 'hi'}])
+
+    assert len(calls) == 2
+    assert gateway.stats()['short_circuited'] == 1
+
+def test_client_errors_do_not_trip_the_breaker():
+    gateway = gateway_with(lambda *args, **kwargs: FakeResponse(400), failure_threshold=1)
+    with pytest.raises(LLMGatewayError):
+        gateway.chat_completion([{'role': 'user', 'content': 'hi'}])
+    assert gateway.breaker.state == 'closed'
+
+def test_timeouts_count_as_upstream_failures():
+    def post(*args, **kwargs):
+        raise requests.Timeout('slow')
+
+    gateway = gateway_with(post, failure_threshold=1)
+    with pytest.raises(LLMGatewayError):
+        gateway.chat_completion([{'role': 'user', 'content': 'hi'}])
+    assert gateway.breaker.state == 'open'
+
+def test_saturated_gateway_rejects_after_the_queue_timeout():
+    release = threading.Event()
+    entered = threading.Event()
+
+    def post(*args, **kwargs):
+        entered.set()
+        release.wait(5)
+        return FakeResponse()
+
+    gateway = gateway_with(post, max_concurrency=1, queue_timeout=0.1, timeout=10)
+    holder = threading.Thread(target=gateway.chat_completion, args=([{'role': 'user', 'content': 'hi'}],))
+    holder.start()
+    assert entered.wait(5)
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(GatewayBusyError):
+            gateway.chat_completion([{'role': 'user', 'content': 'hi'}])
+        waited = time.monotonic() - started
+    finally:
+        release.set()
+        holder.join()
+
+    assert 0.1 <= waited < 2
+    assert gateway.stats()['rejected'] == 1
+    # Our own concurrency limit says nothing about the upstream
+    assert gateway.breaker.state == 'closed'
+
+def test_successful_call_returns_the_completion():
+    gateway = gateway_with(lambda *args, **kwargs: FakeResponse(content='answer'))
+    assert gateway.chat_completion([{'role': 'user', 'content': 'hi'}]) == 'answer'
+    assert gateway.stats()['requests'] == 1
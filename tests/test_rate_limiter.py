@@ -0,0 +1,64 @@
+import pytest
+
+from src.utils.rate_limiter import InProcessRateLimitBackend, SQLiteRateLimitBackend, SlidingWindowRateLimiter
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return InProcessRateLimitBackend()
+    return SQLiteRateLimitBackend(str(tmp_path / 'rate_limit.db'))
+
+def test_requests_over_the_limit_are_denied_with_retry_after(backend):
+    limiter = SlidingWindowRateLimiter(max_requests=3, window_seconds=60, backend=backend)
+    assert [limiter.check('a', now=0)[0] for _ in range(3)] == [True, True, True]
+
+    allowed, retry_after = limiter.check('a', now=1)
+    assert not allowed
+    # 59s to the next window, then 20s for this window's 3 to decay to 2
+    assert retry_after == 79
+    # Other keys have their own allowance
+    assert limiter.check('b', now=1) == (True, 0)
+
+def test_retry_after_is_when_the_request_fits_again(backend):
+    limiter = SlidingWindowRateLimiter(max_requests=4, window_seconds=60, backend=backend)
+    for _ in range(4):
+        limiter.check('a', now=30)
+
+    allowed, retry_after = limiter.check('a', now=70)
+    assert not allowed
+    assert limiter.check('a', now=70 + retry_after - 1)[0] is False
+    assert limiter.check('a', now=70 + retry_after)[0] is True
+
+def test_previous_window_decays(backend):
+    limiter = SlidingWindowRateLimiter(max_requests=10, window_seconds=60, backend=backend)
+    for _ in range(10):
+        limiter.check('a', now=59)
+
+    # Half-way through the next window half of the previous count still applies
+    assert sum(limiter.check('a', now=90)[0] for _ in range(10)) == 5
+
+def test_batch_cost_counts_every_message(backend):
+    limiter = SlidingWindowRateLimiter(max_requests=5, window_seconds=60, backend=backend)
+    assert limiter.check('a', now=0, cost=4) == (True, 0)
+    assert limiter.check('a', now=0, cost=2)[0] is False
+    assert limiter.check('a', now=0, cost=1) == (True, 0)
+
+def test_cost_above_the_limit_is_never_granted(backend):
+    limiter = SlidingWindowRateLimiter(max_requests=5, window_seconds=60, backend=backend)
+    assert limiter.check('a', now=0, cost=6) == (False, 60)
+
+def test_an_empty_backend_is_still_used(tmp_path):
+    backend = SQLiteRateLimitBackend(str(tmp_path / 'rate_limit.db'))
+    limiter = SlidingWindowRateLimiter(backend=backend)
+    limiter.check('a', now=0)
+    assert limiter.backend is backend
+    assert len(backend) == 1
+
+def test_limiters_share_sqlite_counters(tmp_path):
+    path = str(tmp_path / 'rate_limit.db')
+    first = SlidingWindowRateLimiter(max_requests=2, window_seconds=60, backend=SQLiteRateLimitBackend(path))
+    second = SlidingWindowRateLimiter(max_requests=2, window_seconds=60, backend=SQLiteRateLimitBackend(path))
+    assert first.check('a', now=0)[0]
+    assert second.check('a', now=0)[0]
+    assert not first.check('a', now=0)[0]
+    assert len(second) == 1
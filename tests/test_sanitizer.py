@@ -0,0 +1,40 @@
+import random
+import re
+
+import pytest
+
+from src.utils.sanitizer import InputSanitizer, REDACTION_PATTERNS
+
+def sequential_redactions(text):
+    """The redactions as plain uncompiled re.sub calls, in order"""
+    for _, pattern, replacement in REDACTION_PATTERNS:
+        text = re.sub(pattern, replacement, text)
+    return ' '.join(text.split())
+
+@pytest.mark.parametrize('text, expected, redactions', [
+    ('456789123http://a', '[SSN_REMOVED][URL_REMOVED]', ('url', 'ssn')),
+    ('4567451234http://example.com', '[PHONE_REMOVED][URL_REMOVED]', ('url', 'phone')),
+    ('329-741770.9858 and more', '329-[PHONE_REMOVED] and more', ('phone',)),
+    ('me@example.com http://x.io?to=a@b.co', '[EMAIL_REMOVED] [URL_REMOVED]', ('url', 'email')),
+])
+def test_redactions_match_the_sequential_substitutions(text, expected, redactions):
+    clean, fired = InputSanitizer().sanitize(text)
+    assert clean == expected == sequential_redactions(text)
+    assert fired == redactions
+
+def test_random_inputs_match_the_sequential_substitutions():
+    sanitizer = InputSanitizer()
+    alphabet = '0123456789' * 3 + '-.  @ab.co' + 'http://'
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 40)))
+        assert sanitizer.sanitize(text)[0] == sequential_redactions(text), text
+
+def test_unsafe_markup_is_stripped_and_length_capped():
+    sanitizer = InputSanitizer(max_length=20)
+    clean, fired = sanitizer.sanitize('<b>hello</b> javascript:world ' + 'x' * 50)
+    assert clean == 'hello world ' + 'x' * 8
+    assert fired == ()
+
+def test_non_text_input_is_empty():
+    assert InputSanitizer().sanitize(None) == ('', ())
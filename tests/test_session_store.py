@@ -0,0 +1,92 @@
+from src.utils.session_store import InMemorySessionStore, SQLiteSessionStore
+
+def new_session():
+    return {'session_id': 's1', 'messages': [], 'areas_covered': set(), 'course_info': {'ai_tools': []}}
+
+def message(content):
+    return {'sender': 'user', 'content': content}
+
+def test_save_queues_until_flush_and_reads_see_queued_writes(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+    conversation = new_session()
+    conversation['messages'].append(message('hello'))
+    store.save('s1', conversation)
+
+    assert store._read_state('s1') is None
+    assert store.get('s1')['messages'] == [message('hello')]
+
+    store.flush()
+    assert store._read_state('s1') is not None
+    assert store.get('s1')['messages'] == [message('hello')]
+
+def test_only_new_messages_are_appended(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+    conversation = new_session()
+    conversation['messages'].append(message('one'))
+    store.save('s1', conversation)
+    store.flush()
+
+    conversation = store.get('s1')
+    conversation['messages'].append(message('two'))
+    store.save('s1', conversation)
+    store.flush()
+
+    assert [m['content'] for m in store.get('s1')['messages']] == ['one', 'two']
+
+def test_unchanged_session_is_not_written_again():
+    store = InMemorySessionStore(sweep_interval=0)
+    conversation = new_session()
+    store.save('s1', conversation)
+    store.flush()
+
+    loaded = store.get('s1')
+    store.save('s1', loaded)
+    assert store._pending_states == {}
+
+    loaded['course_info']['ai_tools'].append('canva')
+    store.save('s1', loaded)
+    assert 's1' in store._pending_states
+
+def test_message_only_change_queues_messages_without_state():
+    store = InMemorySessionStore(sweep_interval=0)
+    store.save('s1', new_session())
+    store.flush()
+
+    loaded = store.get('s1')
+    loaded['messages'].append(message('hi'))
+    store.save('s1', loaded)
+    assert store._pending_states == {}
+    assert len(store._pending_messages) == 1
+    store.flush()
+    assert store.get('s1')['messages'] == [message('hi')]
+
+def test_loaded_sessions_carry_only_the_history_window():
+    store = InMemorySessionStore(history_window=3, sweep_interval=0)
+    conversation = new_session()
+    conversation['messages'] = [message(str(i)) for i in range(10)]
+    store.save('s1', conversation)
+    store.flush()
+
+    assert [m['content'] for m in store.get('s1')['messages']] == ['7', '8', '9']
+
+def test_sets_survive_a_round_trip():
+    store = InMemorySessionStore(sweep_interval=0)
+    conversation = new_session()
+    conversation['areas_covered'] = {'AI in Context'}
+    store.save('s1', conversation)
+    store.flush()
+
+    assert store.get('s1')['areas_covered'] == {'AI in Context'}
+
+def test_capacity_eviction_spills_and_restores(tmp_path):
+    spill = SQLiteSessionStore(str(tmp_path / 'spill.db'))
+    store = InMemorySessionStore(max_entries=1, spill_store=spill, sweep_interval=0)
+    for session_id in ('a', 'b'):
+        conversation = new_session()
+        conversation['messages'].append(message(session_id))
+        store.save(session_id, conversation)
+        store.flush()
+
+    assert store.counters['capacity_evictions'] == 1
+    assert store.get('a')['messages'] == [message('a')]
+    assert store.counters['restored'] == 1
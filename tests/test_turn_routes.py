@@ -0,0 +1,21 @@
+def test_health_reports_streamed_turn_routes(client):
+    session_id = client.post('/api/conversations').get_json()['session_id']
+    before = client.get('/api/health').get_json()['turn_routes']
+
+    response = client.post(f'/api/conversations/{session_id}/messages', json={'message': 'yes'},
+                           headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+    assert 'event: done' in response.get_data(as_text=True)
+
+    after = client.get('/api/health').get_json()['turn_routes']
+    assert after['turns'] == before['turns'] + 1
+    assert after['fast_path'] == before['fast_path'] + 1
+
+def test_json_turns_use_the_framework_engine(client):
+    session_id = client.post('/api/conversations').get_json()['session_id']
+    before = client.get('/api/health').get_json()['turn_routes']['turns']
+
+    data = client.post(f'/api/conversations/{session_id}/messages',
+                       json={'message': 'A course on machine learning'}).get_json()
+    assert data['ai_response']['content'].startswith('Excellent choice! Machine learning')
+    assert client.get('/api/health').get_json()['turn_routes']['turns'] == before